@@ -8,6 +8,7 @@ Level 4: Full historian - ERP/MES historian plus all advanced features
 
 from enum import IntEnum
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Set
 
 
@@ -21,7 +22,7 @@ class ComplexityLevel(IntEnum):
     LEVEL_4_FULL = 4  # Full historian with ERP/MES + all features
 
 
-@dataclass
+@dataclass(frozen=True)
 class LevelFeatures:
     """Features enabled at each complexity level."""
 
@@ -50,42 +51,46 @@ class LevelFeatures:
     dpp: bool = False  # Digital Product Passports with CO2 tracking
 
 
+@lru_cache(maxsize=None)
 def get_features_for_level(level: ComplexityLevel) -> LevelFeatures:
-    """Get the features enabled for a given complexity level."""
-    features = LevelFeatures()
+    """Get the features enabled for a given complexity level.
 
+    Results are cached per level; LevelFeatures is frozen so callers can share them.
+    """
     if level == ComplexityLevel.LEVEL_0_PAUSED:
-        return features
+        return LevelFeatures()
+
+    flags = {}
 
     # Level 1: Basic sensors
     if level >= ComplexityLevel.LEVEL_1_SENSORS:
-        features.sensors = True
-        features.energy_basic = True
+        flags["sensors"] = True
+        flags["energy_basic"] = True
 
     # Level 2: Stateful
     if level >= ComplexityLevel.LEVEL_2_STATEFUL:
-        features.machine_state = True
-        features.job_tracking = True
-        features.agv_positions = True
-        features.retain_messages = True
+        flags["machine_state"] = True
+        flags["job_tracking"] = True
+        flags["agv_positions"] = True
+        flags["retain_messages"] = True
 
     # Level 3: ERP/MES enrichments
     if level >= ComplexityLevel.LEVEL_3_ERP_MES:
-        features.erp_job_data = True
-        features.mes_quality = True
-        features.mes_oee = True
-        features.delivery_metrics = True
-        features.inventory_wip = True
-        features.dashboards = True
+        flags["erp_job_data"] = True
+        flags["mes_quality"] = True
+        flags["mes_oee"] = True
+        flags["delivery_metrics"] = True
+        flags["inventory_wip"] = True
+        flags["dashboards"] = True
 
     # Level 4: Full historian
     if level >= ComplexityLevel.LEVEL_4_FULL:
-        features.historian_erp_mes = True
-        features.analytics_advanced = True
-        features.events_alarms = True
-        features.dpp = True  # Digital Product Passports with CO2 and traceability
+        flags["historian_erp_mes"] = True
+        flags["analytics_advanced"] = True
+        flags["events_alarms"] = True
+        flags["dpp"] = True  # Digital Product Passports with CO2 and traceability
 
-    return features
+    return LevelFeatures(**flags)
 
 
 def get_namespaces_for_level(level: ComplexityLevel) -> Set[str]:
@@ -121,7 +121,7 @@ class ProductClassification:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class OperationRecord:
     """Record of a single manufacturing operation."""
 
@@ -167,7 +167,7 @@ class OperationRecord:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class QualityCheck:
     """Quality inspection record."""
 
@@ -193,7 +193,7 @@ class QualityCheck:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class MaterialInfo:
     """Material origin and properties."""
 
@@ -231,7 +231,7 @@ class MaterialInfo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CarbonFootprint:
     """Detailed CO2 emissions breakdown."""
 
@@ -526,13 +526,20 @@ class DPPGenerator:
         ("Voestalpine", "AT"),
     ]
 
-    def __init__(self, grid_carbon_intensity: float = 350.0, renewable_pct: float = 30.0):
+    def __init__(
+        self,
+        grid_carbon_intensity: float = 350.0,
+        renewable_pct: float = 30.0,
+        rng: Optional[random.Random] = None,
+    ):
         """Initialize DPP generator.
 
         Args:
             grid_carbon_intensity: Grid carbon intensity in g CO2/kWh (default: EU average ~350)
             renewable_pct: Percentage of renewable energy in grid (default: EU ~30%)
+            rng: Random source for generated identifiers and scores (default: module random)
         """
+        self._random = rng if rng is not None else random
         self.grid_carbon_intensity = grid_carbon_intensity
         self.renewable_pct = renewable_pct
 
@@ -542,7 +549,7 @@ class DPPGenerator:
             material_code = "DC01"
 
         mat_name, mat_type, embodied_carbon, recycled_pct = self.MATERIALS[material_code]
-        supplier, origin = random.choice(self.SUPPLIERS)
+        supplier, origin = self._random.choice(self.SUPPLIERS)
 
         return MaterialInfo(
             material_code=material_code,
@@ -554,7 +561,7 @@ class DPPGenerator:
             recyclable=True,
             supplier=supplier,
             origin_country=origin,
-            batch_number=f"BATCH-2025-{random.randint(1000, 9999)}",
+            batch_number=f"BATCH-2025-{self._random.randint(1000, 9999)}",
             embodied_carbon_kg_per_kg=embodied_carbon,
         )
 
@@ -595,16 +602,16 @@ class DPPGenerator:
         """Generate GS1 SGTIN-format unique identifier for ESPR compliance."""
         # GS1 Company Prefix (MetalFab BV) + Item Reference + Serial
         company_prefix = "8712345"  # Fictional NL GS1 prefix
-        item_ref = f"{random.randint(10000, 99999)}"
-        serial = f"{random.randint(100000000, 999999999)}"
+        item_ref = f"{self._random.randint(10000, 99999)}"
+        serial = f"{self._random.randint(100000000, 999999999)}"
         return f"urn:epc:id:sgtin:{company_prefix}.{item_ref}.{serial}"
 
     def _generate_data_carrier(self, espr_uid: str) -> DataCarrier:
         """Generate data carrier with GS1 Digital Link URL."""
         # Extract serial from SGTIN for URL
         parts = espr_uid.split(".")
-        serial = parts[-1] if len(parts) >= 3 else str(random.randint(100000, 999999))
-        gtin = f"08712345{random.randint(10000, 99999):05d}"
+        serial = parts[-1] if len(parts) >= 3 else str(self._random.randint(100000, 999999))
+        gtin = f"08712345{self._random.randint(10000, 99999):05d}"
 
         return DataCarrier(
             carrier_type="QR",
@@ -628,7 +635,7 @@ class DPPGenerator:
                           quantity: int, site: str, country: str) -> DigitalProductPassport:
         """Create a new ESPR-compliant DPP for a manufacturing job."""
 
-        dpp_id = f"DPP-{datetime.now().strftime('%Y%m%d')}-{random.randint(10000, 99999)}"
+        dpp_id = f"DPP-{datetime.now().strftime('%Y%m%d')}-{self._random.randint(10000, 99999)}"
 
         # Estimate weight (simplified: 1m² sheet @ thickness)
         weight_kg = 1.0 * thickness_mm * 7.85 / 1000 * quantity  # Steel density approximation
@@ -667,10 +674,10 @@ class DPPGenerator:
             manufacturing_site=site,
             manufacturing_country=country,
             certifications=["ISO 9001:2015", "ISO 14001:2015"],
-            recyclability_score=random.uniform(85, 98),
-            durability_score=random.uniform(70, 95),
-            repairability_score=random.uniform(40, 75),
-            expected_lifetime_years=random.randint(10, 25),
+            recyclability_score=self._random.uniform(85, 98),
+            durability_score=self._random.uniform(70, 95),
+            repairability_score=self._random.uniform(40, 75),
+            expected_lifetime_years=self._random.randint(10, 25),
             recycling_instructions="Steel: 100% recyclable. Return to metal recycler.",
             reach_compliant=True,
             rohs_compliant=True,
@@ -695,23 +702,23 @@ class DPPGenerator:
         parameters = {}
         if "LASER" in machine_type.upper() or "CUTTING" in operation_type.upper():
             parameters = {
-                "laser_power_w": random.randint(3000, 6000),
-                "cutting_speed_mm_min": random.randint(2000, 5000),
-                "assist_gas": random.choice(["N2", "O2"]),
-                "focal_length_mm": random.uniform(5.0, 10.0),
+                "laser_power_w": self._random.randint(3000, 6000),
+                "cutting_speed_mm_min": self._random.randint(2000, 5000),
+                "assist_gas": self._random.choice(["N2", "O2"]),
+                "focal_length_mm": self._random.uniform(5.0, 10.0),
             }
         elif "PRESS" in machine_type.upper() or "BENDING" in operation_type.upper():
             parameters = {
-                "tonnage": random.randint(80, 320),
-                "bend_angle_deg": random.uniform(30, 150),
-                "back_gauge_mm": random.uniform(50, 500),
+                "tonnage": self._random.randint(80, 320),
+                "bend_angle_deg": self._random.uniform(30, 150),
+                "back_gauge_mm": self._random.uniform(50, 500),
             }
         elif "WELD" in operation_type.upper():
             parameters = {
-                "current_a": random.randint(150, 300),
-                "voltage_v": random.uniform(20, 35),
-                "wire_feed_m_min": random.uniform(5, 15),
-                "gas_flow_l_min": random.uniform(12, 20),
+                "current_a": self._random.randint(150, 300),
+                "voltage_v": self._random.uniform(20, 35),
+                "wire_feed_m_min": self._random.uniform(5, 15),
+                "gas_flow_l_min": self._random.uniform(12, 20),
             }
 
         return OperationRecord(
@@ -734,34 +741,34 @@ class DPPGenerator:
     def create_quality_check(self, check_type: str = "DIMENSIONAL") -> QualityCheck:
         """Create a quality inspection record."""
 
-        inspector_id = f"QC_{random.randint(100, 999)}"
+        inspector_id = f"QC_{self._random.randint(100, 999)}"
         inspectors = ["Anna Schmidt", "Peter Jansen", "Maria Ionescu", "Jan de Vries"]
 
-        passed = random.random() > 0.05  # 95% pass rate
+        passed = self._random.random() > 0.05  # 95% pass rate
 
         measurements = {}
         notes = ""
 
         if check_type == "DIMENSIONAL":
             measurements = {
-                "length_mm": round(random.uniform(99.8, 100.2), 2),
-                "width_mm": round(random.uniform(49.9, 50.1), 2),
-                "thickness_mm": round(random.uniform(1.98, 2.02), 2),
+                "length_mm": round(self._random.uniform(99.8, 100.2), 2),
+                "width_mm": round(self._random.uniform(49.9, 50.1), 2),
+                "thickness_mm": round(self._random.uniform(1.98, 2.02), 2),
                 "tolerance_ok": passed,
             }
             notes = "Within tolerance" if passed else "Out of tolerance - rework needed"
         elif check_type == "VISUAL":
             measurements = {
                 "surface_quality": "GOOD" if passed else "FAIR",
-                "scratches": random.randint(0, 2),
-                "dents": random.randint(0, 1),
+                "scratches": self._random.randint(0, 2),
+                "dents": self._random.randint(0, 1),
             }
             notes = "Surface acceptable" if passed else "Minor surface defects"
 
         return QualityCheck(
-            check_id=f"QC-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}",
+            check_id=f"QC-{datetime.now().strftime('%Y%m%d')}-{self._random.randint(1000, 9999)}",
             inspector_id=inspector_id,
-            inspector_name=random.choice(inspectors),
+            inspector_name=self._random.choice(inspectors),
             timestamp=datetime.now().isoformat() + "Z",
             check_type=check_type,
             passed=passed,
@@ -12,6 +12,7 @@ When a triggering value changes, related data is fetched to populate UNS
 with complete relational records.
 """
 
+import json
 import math
 import random
 import time
@@ -19,8 +20,9 @@ import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from faker import Faker
 
 fake = Faker()
@@ -136,6 +138,42 @@ class OperatorStatus(Enum):
     VACATION = "VACATION"
 
 
+# =============================================================================
+# Retained Payload Caching
+# =============================================================================
+
+class CachedPayloadMixin:
+    """Caches the serialized body of an entity's retained payload.
+
+    The body is encoded once and reused until ``_invalidate_payload()`` is
+    called; every method that changes a field the payload covers must call it.
+    ``_updated_at`` is kept out of the cached body and stamped fresh on each
+    call, so retained payloads always carry the publish time.
+    """
+
+    __slots__ = ("_payload_body",)
+
+    def __post_init__(self) -> None:
+        self._payload_body: Optional[bytes] = None
+
+    def _invalidate_payload(self) -> None:
+        """Drop the cached body after a payload field changed."""
+        self._payload_body = None
+
+    def _cached_json(
+        self, build: Callable[[], Dict[str, Any]], now: Optional[datetime] = None
+    ) -> bytes:
+        body = self._payload_body
+        if body is None:
+            payload = build()
+            payload.pop("_updated_at", None)
+            # Keep the body open so the timestamp can be appended as the last key
+            body = json.dumps(payload, separators=(",", ":")).encode()[:-1]
+            self._payload_body = body
+        stamp = (now or datetime.now()).isoformat() + "Z"
+        return b"%s,\"_updated_at\":\"%s\"}" % (body, stamp.encode())
+
+
 # =============================================================================
 # Operator and Shift Management
 # =============================================================================
@@ -201,8 +239,9 @@ class OperatorGenerator:
                   "Meijer", "de Groot", "Bos", "Vos", "Peters", "Hendriks", "van Dijk",
                   "Willems", "de Boer", "Dekker", "Mulder", "Claessen", "van Leeuwen"]
 
-    def __init__(self, num_operators: int = 12):
+    def __init__(self, num_operators: int = 12, rng: Optional[random.Random] = None):
         self.num_operators = num_operators
+        self._random = rng if rng is not None else random
         self._operator_counter = 1000
         self.operators: Dict[str, Operator] = {}
         self._generate_initial_operators()
@@ -228,8 +267,8 @@ class OperatorGenerator:
     def _create_operator(self, role: OperatorRole) -> Operator:
         """Create a single operator."""
         self._operator_counter += 1
-        first_name = random.choice(self.FIRST_NAMES)
-        last_name = random.choice(self.LAST_NAMES)
+        first_name = self._random.choice(self.FIRST_NAMES)
+        last_name = self._random.choice(self.LAST_NAMES)
 
         # Role-specific certifications
         certs = self._get_certifications_for_role(role)
@@ -241,9 +280,9 @@ class OperatorGenerator:
             last_name=last_name,
             role=role,
             certifications=certs,
-            efficiency_rating=round(random.uniform(0.85, 1.15), 2),
-            years_experience=random.randint(1, 25),
-            shift=random.choice(list(ShiftType)),
+            efficiency_rating=round(self._random.uniform(0.85, 1.15), 2),
+            years_experience=self._random.randint(1, 25),
+            shift=self._random.choice(list(ShiftType)),
         )
 
     def _get_certifications_for_role(self, role: OperatorRole) -> List[str]:
@@ -349,7 +388,12 @@ class SolarArray:
 class SolarGenerator:
     """Generates solar power production data."""
 
-    def __init__(self, arrays: Optional[List[SolarArray]] = None):
+    def __init__(
+        self,
+        arrays: Optional[List[SolarArray]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self._random = rng if rng is not None else random
         if arrays is None:
             # Default: typical medium-sized metalworking facility
             self.arrays = [
@@ -394,7 +438,7 @@ class SolarGenerator:
         intensity = math.exp(-0.5 * ((hour - peak_hour) / 3.5) ** 2)
 
         # Add weather variability (cloud cover)
-        weather_factor = random.gauss(0.85, 0.15)
+        weather_factor = self._random.gauss(0.85, 0.15)
         weather_factor = max(0.2, min(1.0, weather_factor))
 
         # Seasonal factor (lower in winter) - simplified
@@ -406,7 +450,7 @@ class SolarGenerator:
     def generate_power_reading(self, array: SolarArray) -> Dict[str, Any]:
         """Generate current power output for an array."""
         intensity = self._get_solar_intensity()
-        current_power = array.capacity_kwp * intensity * random.uniform(0.9, 1.0)
+        current_power = array.capacity_kwp * intensity * self._random.uniform(0.9, 1.0)
 
         # Reset daily counter if new day
         if datetime.now().date() != self._last_reset:
@@ -429,7 +473,7 @@ class SolarGenerator:
         """Generate total solar production for _erp/energy namespace."""
         total_capacity = sum(a.capacity_kwp for a in self.arrays)
         intensity = self._get_solar_intensity()
-        current_total = total_capacity * intensity * random.uniform(0.9, 1.0)
+        current_total = total_capacity * intensity * self._random.uniform(0.9, 1.0)
         daily_total = sum(self._daily_production.values())
 
         # Estimated monetary value (€0.08/kWh feed-in + savings)
@@ -542,7 +586,7 @@ class ProductionOrder:
 
 
 @dataclass
-class InventoryItem:
+class InventoryItem(CachedPayloadMixin):
     """ERP Inventory record following UMH patterns.
 
     Fetched when ItemNumber changes - provides complete inventory context.
@@ -584,6 +628,10 @@ class InventoryItem:
             "_updated_at": datetime.now().isoformat() + "Z",
         }
 
+    def to_erp_json(self, now: Optional[datetime] = None) -> bytes:
+        """Serialized to_erp_dict(), re-encoded only after the item changed."""
+        return self._cached_json(self.to_erp_dict, now)
+
 
 class ProductionOrderGenerator:
     """Generates realistic production orders for a metalworking facility."""
@@ -615,24 +663,25 @@ class ProductionOrderGenerator:
         ("CUST010", "Marel"),
     ]
 
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
         self._order_counter = 7400
+        self._random = rng if rng is not None else random
 
     def generate_order(self) -> ProductionOrder:
         """Generate a new production order."""
         self._order_counter += 1
-        template = random.choice(self.PART_TEMPLATES)
-        customer_id, customer_name = random.choice(self.CUSTOMERS)
+        template = self._random.choice(self.PART_TEMPLATES)
+        customer_id, customer_name = self._random.choice(self.CUSTOMERS)
 
-        qty = random.randint(25, 500)
-        est_hours = qty * random.uniform(0.02, 0.08)
-        material_cost = qty * random.uniform(1.5, 8.0)
+        qty = self._random.randint(25, 500)
+        est_hours = qty * self._random.uniform(0.02, 0.08)
+        material_cost = qty * self._random.uniform(1.5, 8.0)
         labor_cost = est_hours * 55.0  # €55/hour labor rate
-        margin = random.uniform(0.25, 0.40)
+        margin = self._random.uniform(0.25, 0.40)
         quoted = (material_cost + labor_cost) / (1 - margin)
 
         now = datetime.now()
-        sched_start = now + timedelta(days=random.randint(1, 5))
+        sched_start = now + timedelta(days=self._random.randint(1, 5))
         sched_end = sched_start + timedelta(hours=est_hours * 1.2)
 
         return ProductionOrder(
@@ -641,14 +690,14 @@ class ProductionOrderGenerator:
             scheduled_start_time=sched_start,
             scheduled_end_time=sched_end,
             ordered_quantity=qty,
-            item_number=f"PN-{random.randint(10000, 99999)}",
-            item_description=f"{template['name']} {random.randint(100, 999)}",
+            item_number=f"PN-{self._random.randint(10000, 99999)}",
+            item_description=f"{template['name']} {self._random.randint(100, 999)}",
             material_spec=template["material"],
             sheet_thickness_mm=template["thickness"],
             customer_id=customer_id,
             customer_name=customer_name,
-            sales_order_number=f"SO-{random.randint(50000, 59999)}",
-            routing_id=f"RTG-{random.randint(100, 999)}",
+            sales_order_number=f"SO-{self._random.randint(50000, 59999)}",
+            routing_id=f"RTG-{self._random.randint(100, 999)}",
             total_operations=template["ops"],
             estimated_hours=round(est_hours, 1),
             material_cost_eur=round(material_cost, 2),
@@ -673,8 +722,12 @@ class InventoryGenerator:
     SUPPLIERS = ["ThyssenKrupp", "ArcelorMittal", "SSAB", "Outokumpu", "Aleris"]
     LOCATIONS = ["Warehouse A", "Warehouse B", "Production Floor", "Receiving Dock"]
 
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._random = rng if rng is not None else random
         self.inventory: Dict[str, InventoryItem] = {}
+        # Aggregates kept in step with available_quantity via adjust()
+        self.total_value_eur = 0.0
+        self.low_stock: Dict[str, InventoryItem] = {}
         self._generate_initial_inventory()
 
     def _generate_initial_inventory(self) -> None:
@@ -687,16 +740,36 @@ class InventoryGenerator:
                     item_description=f"{description} {thickness}mm",
                     material_type=material_code,
                     thickness_mm=thickness,
-                    available_quantity=random.randint(50, 500),
-                    reserved_quantity=random.randint(0, 50),
-                    ordered_quantity=random.randint(0, 200) if random.random() > 0.7 else 0,
-                    location=random.choice(self.LOCATIONS),
-                    unit_cost_eur=round(random.uniform(5, 50) * thickness, 2),
-                    last_receipt_date=datetime.now() - timedelta(days=random.randint(1, 30)),
-                    minimum_stock=random.randint(20, 100),
-                    supplier=random.choice(self.SUPPLIERS),
+                    available_quantity=self._random.randint(50, 500),
+                    reserved_quantity=self._random.randint(0, 50),
+                    ordered_quantity=self._random.randint(0, 200) if self._random.random() > 0.7 else 0,
+                    location=self._random.choice(self.LOCATIONS),
+                    unit_cost_eur=round(self._random.uniform(5, 50) * thickness, 2),
+                    last_receipt_date=datetime.now() - timedelta(days=self._random.randint(1, 30)),
+                    minimum_stock=self._random.randint(20, 100),
+                    supplier=self._random.choice(self.SUPPLIERS),
                 )
 
+        self.total_value_eur = sum(
+            i.available_quantity * i.unit_cost_eur for i in self.inventory.values()
+        )
+        self.low_stock = {
+            num: i for num, i in self.inventory.items() if i.available_quantity < i.minimum_stock
+        }
+
+    def adjust(self, item_number: str, delta_qty: int) -> InventoryItem:
+        """Change an item's available quantity and update the cached aggregates."""
+        item = self.inventory[item_number]
+        item.available_quantity += delta_qty
+        item._invalidate_payload()
+        self.total_value_eur += delta_qty * item.unit_cost_eur
+
+        if item.available_quantity < item.minimum_stock:
+            self.low_stock[item_number] = item
+        else:
+            self.low_stock.pop(item_number, None)
+        return item
+
 
 # =============================================================================
 # Asset Metadata (Descriptive Namespace)
@@ -836,7 +909,7 @@ def create_asset_metadata(cell_id: str, cell_type: str) -> AssetMetadata:
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class AGVPosition:
     """Enhanced AGV position with rich state data.
 
@@ -929,8 +1002,14 @@ RAL_COLORS = [
     ("RAL 9006", "White Aluminium", "#A1A1A0"),
 ]
 
+# Payload form of RAL_COLORS, built once for the metadata messages
+RAL_COLOR_DICTS = tuple(
+    {"ral_code": code, "ral_name": name, "hex": hex_code}
+    for code, name, hex_code in RAL_COLORS
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class CoatingOrder:
     """An order for powder coating from a facility."""
 
@@ -977,7 +1056,7 @@ class CoatingOrder:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Traversal:
     """A traversal (batch of parts on hangers) moving through the coating line."""
 
@@ -991,14 +1070,15 @@ class Traversal:
     ral_name: str
     total_weight_kg: float = 0.0
     hanger_count: int = 1
+    state_topic: str = field(default="", repr=False)  # Set by PowderCoatingLine
 
-    def time_in_zone_seconds(self) -> float:
+    def time_in_zone_seconds(self, now: Optional[datetime] = None) -> float:
         """Calculate time spent in current zone."""
-        return (datetime.now() - self.zone_entered_at).total_seconds()
+        return ((now or datetime.now()) - self.zone_entered_at).total_seconds()
 
-    def time_in_zone_formatted(self) -> str:
+    def time_in_zone_formatted(self, now: Optional[datetime] = None) -> str:
         """Human readable time in zone."""
-        secs = self.time_in_zone_seconds()
+        secs = self.time_in_zone_seconds(now)
         if secs < 60:
             return f"{int(secs)}s"
         elif secs < 3600:
@@ -1006,8 +1086,13 @@ class Traversal:
         else:
             return f"{secs / 3600:.1f}h"
 
-    def to_state_dict(self) -> Dict[str, Any]:
-        """Convert to state message."""
+    def to_state_dict(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Convert to state message.
+
+        Pass ``now`` to stamp a batch of traversals from a single clock read.
+        """
+        now = now or datetime.now()
+        secs = self.time_in_zone_seconds(now)
         return {
             "traversal_id": self.traversal_id,
             "job_id": self.job_id,
@@ -1018,17 +1103,17 @@ class Traversal:
             "hanger_count": self.hanger_count,
             "current_zone": self.current_zone.value,
             "zone_entered_at": self.zone_entered_at.isoformat() + "Z",
-            "time_in_zone": self.time_in_zone_formatted(),
-            "time_in_zone_seconds": round(self.time_in_zone_seconds(), 0),
+            "time_in_zone": self.time_in_zone_formatted(now),
+            "time_in_zone_seconds": round(secs, 0),
             "ral_code": self.ral_code,
             "ral_name": self.ral_name,
             "total_weight_kg": round(self.total_weight_kg, 1),
-            "_updated_at": datetime.now().isoformat() + "Z",
+            "_updated_at": now.isoformat() + "Z",
         }
 
 
-@dataclass
-class CoatingBoothState:
+@dataclass(slots=True)
+class CoatingBoothState(CachedPayloadMixin):
     """State of the powder coating booth."""
 
     booth_id: str
@@ -1045,10 +1130,11 @@ class CoatingBoothState:
     guns_active: int = 12
     electrostatic_kv: float = 80.0
     air_pressure_bar: float = 4.0
+    _since_label: str = field(default="", init=False, repr=False)
 
-    def time_since_color_change(self) -> str:
+    def time_since_color_change(self, now: Optional[datetime] = None) -> str:
         """Human readable time since last color change."""
-        delta = datetime.now() - self.last_color_change
+        delta = (now or datetime.now()) - self.last_color_change
         hours = delta.total_seconds() / 3600
         if hours < 1:
             return f"{int(delta.total_seconds() / 60)}m"
@@ -1057,8 +1143,10 @@ class CoatingBoothState:
         else:
             return f"{hours / 24:.1f}d"
 
-    def to_state_dict(self) -> Dict[str, Any]:
+    def to_state_dict(self, now: Optional[datetime] = None) -> Dict[str, Any]:
         """Convert to stateful message for _state namespace."""
+        if now is None:
+            now = datetime.now()
         return {
             "booth_id": self.booth_id,
             "current_color": {
@@ -1067,15 +1155,25 @@ class CoatingBoothState:
                 "hex": self.current_ral_hex,
             },
             "last_color_change": self.last_color_change.isoformat() + "Z",
-            "time_since_color_change": self.time_since_color_change(),
+            "time_since_color_change": self.time_since_color_change(now),
             "color_change_count_today": self.color_change_count_today,
             "powder_level_pct": round(self.powder_level_pct, 1),
             "recovery_efficiency_pct": round(self.recovery_efficiency_pct, 1),
             "guns_active": self.guns_active,
             "guns_total": self.gun_count,
-            "_updated_at": datetime.now().isoformat() + "Z",
+            "_updated_at": now.isoformat() + "Z",
         }
 
+    def to_state_json(self, now: Optional[datetime] = None) -> bytes:
+        """Serialized to_state_dict(), re-encoded when the state or its age label changes."""
+        if now is None:
+            now = datetime.now()
+        since = self.time_since_color_change(now)
+        if since != self._since_label:
+            self._since_label = since
+            self._invalidate_payload()
+        return self._cached_json(lambda: self.to_state_dict(now), now)
+
     def to_sensor_dict(self) -> Dict[str, Any]:
         """Convert to sensor readings for _raw namespace."""
         return {
@@ -1088,8 +1186,8 @@ class CoatingBoothState:
         }
 
 
-@dataclass
-class OvenState:
+@dataclass(slots=True)
+class OvenState(CachedPayloadMixin):
     """State of a curing/drying oven."""
 
     oven_id: str
@@ -1119,6 +1217,10 @@ class OvenState:
             "_updated_at": datetime.now().isoformat() + "Z",
         }
 
+    def to_state_json(self, now: Optional[datetime] = None) -> bytes:
+        """Serialized to_state_dict(), re-encoded only after a state field changed."""
+        return self._cached_json(self.to_state_dict, now)
+
     def to_sensor_dict(self) -> Dict[str, Any]:
         """Convert to sensor readings for _raw namespace."""
         # Simulate zone temperatures with slight variation
@@ -1174,14 +1276,38 @@ class PowderCoatingLine:
         PowderCoatingZone.UNLOADING: 60,
     }
 
-    def __init__(self, line_id: str = "COAT_LINE_01", location: str = "eindhoven"):
+    # UNS path of the line within the finishing area
+    TOPIC_BASE = "finishing/coating_line_01"
+
+    def __init__(
+        self,
+        line_id: str = "COAT_LINE_01",
+        location: str = "eindhoven",
+        rng: Optional[random.Random] = None,
+    ):
         self.line_id = line_id
         self.location = location  # Shared resource location
+        self._random = rng if rng is not None else random
+
+        # Topics are fixed for the life of the line, so build them once
+        base = self.TOPIC_BASE
+        self.topics = {
+            "summary": f"{base}/_state/summary",
+            "booth_state": f"{base}/_state/booth",
+            "drying_state": f"{base}/_state/drying_oven",
+            "curing_state": f"{base}/_state/curing_oven",
+            "booth_raw": f"{base}/_raw/booth",
+            "drying_raw": f"{base}/_raw/drying_oven",
+            "curing_raw": f"{base}/_raw/curing_oven",
+            "meta": f"{base}/_meta/line",
+            "planning_summary": f"{base}/_mes/planning/summary",
+            "planning_queue": f"{base}/_mes/planning/queue",
+        }
         self._traversal_counter = 1000
         self._order_counter = 5000
 
         # Current RAL color
-        ral = random.choice(RAL_COLORS)
+        ral = self._random.choice(RAL_COLORS)
         self.current_ral_code = ral[0]
         self.current_ral_name = ral[1]
         self.current_ral_hex = ral[2]
@@ -1201,6 +1327,10 @@ class PowderCoatingLine:
             "roeselare": "MetalFab Roeselare (BE)",
             "brasov": "MetalFab Brasov (RO)",
         }
+        self.facility_topics = {
+            facility: f"{self.TOPIC_BASE}/_mes/planning/facility/{facility}"
+            for facility in self.facilities
+        }
 
         # Zone states
         self.coating_booth = CoatingBoothState(
@@ -1208,7 +1338,7 @@ class PowderCoatingLine:
             current_ral_code=self.current_ral_code,
             current_ral_name=self.current_ral_name,
             current_ral_hex=self.current_ral_hex,
-            last_color_change=datetime.now() - timedelta(hours=random.randint(1, 8)),
+            last_color_change=datetime.now() - timedelta(hours=self._random.randint(1, 8)),
         )
 
         self.drying_oven = OvenState(
@@ -1231,6 +1361,15 @@ class PowderCoatingLine:
             gas_consumption_m3h=25.0,
         )
 
+        # Fixed (topic, zone) pairs the publishers walk every tick
+        zones = (
+            ("booth", self.coating_booth),
+            ("drying", self.drying_oven),
+            ("curing", self.curing_oven),
+        )
+        self.zone_state_sources = tuple((self.topics[f"{key}_state"], zone) for key, zone in zones)
+        self.zone_raw_sources = tuple((self.topics[f"{key}_raw"], zone) for key, zone in zones)
+
         # Initialize with some orders from different facilities
         self._init_orders()
         self._init_traversals()
@@ -1241,25 +1380,25 @@ class PowderCoatingLine:
         customers = ["Siemens AG", "Bosch Rexroth", "Atlas Copco", "Vanderlande", "ASML"]
 
         # Create 8-12 orders from various facilities
-        for _ in range(random.randint(8, 12)):
-            facility = random.choice(facilities)
-            ral = random.choice(RAL_COLORS)
+        for _ in range(self._random.randint(8, 12)):
+            facility = self._random.choice(facilities)
+            ral = self._random.choice(RAL_COLORS)
             self._order_counter += 1
 
             order = CoatingOrder(
                 order_id=f"COAT_{self._order_counter}",
                 source_facility=facility,
                 source_site_name=self.facilities[facility],
-                job_id=f"JOB_{random.randint(9900, 9999)}",
-                customer=random.choice(customers),
-                part_description=f"{random.choice(['Bracket', 'Panel', 'Frame', 'Housing'])} {random.randint(100, 999)}",
-                part_count=random.randint(10, 100),
+                job_id=f"JOB_{self._random.randint(9900, 9999)}",
+                customer=self._random.choice(customers),
+                part_description=f"{self._random.choice(['Bracket', 'Panel', 'Frame', 'Housing'])} {self._random.randint(100, 999)}",
+                part_count=self._random.randint(10, 100),
                 ral_code=ral[0],
                 ral_name=ral[1],
                 ral_hex=ral[2],
-                priority=random.choice([1, 1, 5, 5, 5, 5, 10]),  # Most are normal priority
-                requested_date=datetime.now() + timedelta(days=random.randint(1, 14)),
-                estimated_duration_min=random.uniform(30, 90),
+                priority=self._random.choice([1, 1, 5, 5, 5, 5, 10]),  # Most are normal priority
+                requested_date=datetime.now() + timedelta(days=self._random.randint(1, 14)),
+                estimated_duration_min=self._random.uniform(30, 90),
             )
             self.order_queue.append(order)
 
@@ -1327,29 +1466,29 @@ class PowderCoatingLine:
 
             # Create traversal from order
             for zone in self.ZONE_ORDER[:-1]:  # Skip unloading
-                if random.random() < 0.3:  # 30% chance per zone
+                if self._random.random() < 0.3:  # 30% chance per zone
                     self._add_traversal_from_order(zone, order)
         else:
             # Fallback: create dummy orders for initial traversals
             for zone in self.ZONE_ORDER[:-1]:
-                if random.random() < 0.2:
+                if self._random.random() < 0.2:
                     dummy_order = self._create_dummy_order()
                     self._add_traversal_from_order(zone, dummy_order)
 
     def _create_dummy_order(self) -> CoatingOrder:
         """Create a dummy order for initialization."""
         self._order_counter += 1
-        ral = random.choice(RAL_COLORS)
-        facility = random.choice(["eindhoven", "roeselare", "brasov"])
+        ral = self._random.choice(RAL_COLORS)
+        facility = self._random.choice(["eindhoven", "roeselare", "brasov"])
 
         return CoatingOrder(
             order_id=f"COAT_{self._order_counter}",
             source_facility=facility,
             source_site_name=self.facilities[facility],
-            job_id=f"JOB_{random.randint(9900, 9999)}",
+            job_id=f"JOB_{self._random.randint(9900, 9999)}",
             customer="Sample Customer",
             part_description="Sample Part",
-            part_count=random.randint(10, 50),
+            part_count=self._random.randint(10, 50),
             ral_code=ral[0],
             ral_name=ral[1],
             ral_hex=ral[2],
@@ -1367,15 +1506,16 @@ class PowderCoatingLine:
             traversal_id=trav_id,
             coating_order=order,
             job_id=order.job_id,
-            part_count=min(order.part_count, random.randint(4, 20)),  # Parts per hanger batch
+            part_count=min(order.part_count, self._random.randint(4, 20)),  # Parts per hanger batch
             current_zone=zone,
             zone_entered_at=datetime.now() - timedelta(
-                seconds=random.randint(0, self.ZONE_DWELL_TIMES[zone])
+                seconds=self._random.randint(0, self.ZONE_DWELL_TIMES[zone])
             ),
             ral_code=order.ral_code,
             ral_name=order.ral_name,
-            total_weight_kg=random.uniform(20, 100),
-            hanger_count=random.randint(2, 8),
+            total_weight_kg=self._random.uniform(20, 100),
+            hanger_count=self._random.randint(2, 8),
+            state_topic=f"{self.TOPIC_BASE}/_state/traversals/{trav_id}",
         )
         self.traversals[trav_id] = traversal
         return traversal
@@ -1420,7 +1560,7 @@ class PowderCoatingLine:
         if self.count_in_zone(PowderCoatingZone.LOADING) < 3 and self.scheduled_orders:
             next_order = self.scheduled_orders[0]
             # Check if color matches or if it's time for changeover
-            if next_order.ral_code == self.current_ral_code or random.random() < 0.05:
+            if next_order.ral_code == self.current_ral_code or self._random.random() < 0.05:
                 # Start order
                 order = self.scheduled_orders.pop(0)
                 order.status = "IN_PROGRESS"
@@ -1431,31 +1571,38 @@ class PowderCoatingLine:
                 self._add_traversal_from_order(PowderCoatingZone.LOADING, order)
 
         # Periodically generate new orders from random facilities
-        if random.random() < 0.02:  # 2% chance per tick
-            facility = random.choice(["eindhoven", "roeselare", "brasov"])
-            ral = random.choice(RAL_COLORS)
+        if self._random.random() < 0.02:  # 2% chance per tick
+            facility = self._random.choice(["eindhoven", "roeselare", "brasov"])
+            ral = self._random.choice(RAL_COLORS)
             self.create_order_from_facility(
                 facility=facility,
-                job_id=f"JOB_{random.randint(9900, 9999)}",
-                part_count=random.randint(10, 80),
+                job_id=f"JOB_{self._random.randint(9900, 9999)}",
+                part_count=self._random.randint(10, 80),
                 ral_code=ral[0],
-                priority=random.choice([1, 5, 5, 10]),
+                priority=self._random.choice([1, 5, 5, 10]),
             )
 
         # Update oven traversal counts
-        self.drying_oven.traversals_inside = self.count_in_zone(PowderCoatingZone.DRYING_OVEN)
-        self.curing_oven.traversals_inside = self.count_in_zone(PowderCoatingZone.CURING_OVEN)
+        for oven, zone in (
+            (self.drying_oven, PowderCoatingZone.DRYING_OVEN),
+            (self.curing_oven, PowderCoatingZone.CURING_OVEN),
+        ):
+            inside = self.count_in_zone(zone)
+            if inside != oven.traversals_inside:
+                oven.traversals_inside = inside
+                oven._invalidate_payload()
 
         # Simulate oven temperature fluctuations
-        self.drying_oven.internal_temp_c = self.drying_oven.setpoint_temp_c + random.gauss(0, 2)
-        self.curing_oven.internal_temp_c = self.curing_oven.setpoint_temp_c + random.gauss(0, 3)
+        self.drying_oven.internal_temp_c = self.drying_oven.setpoint_temp_c + self._random.gauss(0, 2)
+        self.curing_oven.internal_temp_c = self.curing_oven.setpoint_temp_c + self._random.gauss(0, 3)
 
         # Powder consumption
         coating_count = self.count_in_zone(PowderCoatingZone.COATING_BOOTH)
         if coating_count > 0:
-            self.coating_booth.powder_level_pct -= random.uniform(0.01, 0.05)
+            self.coating_booth.powder_level_pct -= self._random.uniform(0.01, 0.05)
             if self.coating_booth.powder_level_pct < 20:
                 self.coating_booth.powder_level_pct = 85  # Refilled
+            self.coating_booth._invalidate_payload()
 
         return completed
 
@@ -1470,6 +1617,7 @@ class PowderCoatingLine:
         self.coating_booth.current_ral_hex = ral_hex
         self.coating_booth.last_color_change = datetime.now()
         self.coating_booth.color_change_count_today += 1
+        self.coating_booth._invalidate_payload()
 
     def count_in_zone(self, zone: PowderCoatingZone) -> int:
         """Count traversals in a specific zone."""
@@ -1608,10 +1756,7 @@ class PowderCoatingLine:
                 "setpoint_temp_c": self.curing_oven.setpoint_temp_c,
                 "dwell_time_min": self.curing_oven.dwell_time_min,
             },
-            "available_colors": [
-                {"ral_code": r[0], "ral_name": r[1], "hex": r[2]}
-                for r in RAL_COLORS
-            ],
+            "available_colors": RAL_COLOR_DICTS,
         }
 
 
@@ -1620,7 +1765,7 @@ class PowderCoatingLine:
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class SensorGenerator:
     """Generates realistic sensor values with noise."""
 
@@ -1635,21 +1780,26 @@ class SensorGenerator:
     _current_drift: float = field(default=0.0, init=False)
     _last_update: float = field(default_factory=time.time, init=False)
 
-    def _compute_value(self, state: PackMLState = PackMLState.EXECUTE) -> float:
-        """Compute the sensor value based on state."""
-        now = time.time()
-        elapsed_hours = (now - self._last_update) / 3600
+    def _advance_drift(self, now: float) -> float:
+        """Apply drift accumulated up to ``now`` and return the current drift."""
+        if self.drift_rate != 0:
+            self._current_drift += self.drift_rate * (now - self._last_update) / 3600
         self._last_update = now
+        return self._current_drift
 
-        # Apply drift
-        if self.drift_rate != 0:
-            self._current_drift += self.drift_rate * elapsed_hours
+    def _compute_value(
+        self, state: PackMLState = PackMLState.EXECUTE, now: Optional[float] = None
+    ) -> float:
+        """Compute the sensor value based on state."""
+        if now is None:
+            now = time.time()
+        drift = self._advance_drift(now)
 
         # Base value depends on state
         if state in (PackMLState.STOPPED, PackMLState.IDLE, PackMLState.ABORTED):
             effective_base = self.min_value
         elif state == PackMLState.EXECUTE:
-            effective_base = self.base_value + self._current_drift
+            effective_base = self.base_value + drift
         else:
             effective_base = self.base_value * 0.5  # Transitional states
 
@@ -1665,11 +1815,18 @@ class SensorGenerator:
         """Generate just the sensor value (simple payload)."""
         return self._compute_value(state)
 
-    def generate(self, state: PackMLState = PackMLState.EXECUTE) -> Dict[str, Any]:
-        """Generate a sensor reading with timestamp (for _raw)."""
-        value = self._compute_value(state)
+    def generate(
+        self, state: PackMLState = PackMLState.EXECUTE, now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Generate a sensor reading with timestamp (for _raw).
+
+        ``now`` (epoch seconds) lets callers stamp a batch of readings with one clock read.
+        """
+        if now is None:
+            now = time.time()
+        value = self._compute_value(state, now)
         return {
-            "timestamp_ms": int(time.time() * 1000),
+            "timestamp_ms": int(now * 1000),
             "value": value,
         }
 
@@ -1686,6 +1843,75 @@ class SensorGenerator:
         return reading
 
 
+class SensorBatchGenerator:
+    """Generates readings for many sensors at once with NumPy noise and clipping.
+
+    The given SensorGenerator instances stay the single owner of each sensor's
+    parameters and drift: every call reads them and advances their drift, so
+    batched and single readings never diverge. Each sensor reads according to a
+    state code, mirroring SensorGenerator._compute_value(): STATE_OFF sits at
+    the minimum, STATE_EXECUTE at base value plus drift and STATE_TRANSITION at
+    half the base value.
+    """
+
+    STATE_OFF = 0
+    STATE_EXECUTE = 1
+    STATE_TRANSITION = 2
+
+    def __init__(
+        self,
+        generators: Sequence[SensorGenerator],
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.generators = list(generators)
+        self.sensor_ids = [g.sensor_id for g in self.generators]
+        self._rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self) -> int:
+        return len(self.sensor_ids)
+
+    @classmethod
+    def state_code(cls, state: PackMLState) -> int:
+        """Map a machine state to the sensor state code."""
+        if state in (PackMLState.STOPPED, PackMLState.IDLE, PackMLState.ABORTED):
+            return cls.STATE_OFF
+        if state == PackMLState.EXECUTE:
+            return cls.STATE_EXECUTE
+        return cls.STATE_TRANSITION
+
+    def generate_all(
+        self,
+        state_codes: np.ndarray,
+        now: Optional[float] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> np.ndarray:
+        """Generate one reading per sensor, rounded like SensorGenerator values.
+
+        ``indices`` restricts the batch to those sensors; ``state_codes`` then
+        holds one code per selected sensor.
+        """
+        if now is None:
+            now = time.time()
+        generators = self.generators
+        if indices is not None:
+            generators = [generators[i] for i in indices]
+        params = np.array(
+            [
+                (g.base_value, g.min_value, g.max_value, g.noise_stddev, g._advance_drift(now))
+                for g in generators
+            ],
+            dtype=float,
+        ).reshape(-1, 5)
+        base_value, min_value, max_value, noise, drift = params.T
+
+        base = np.where(
+            state_codes == self.STATE_EXECUTE, base_value + drift, base_value * 0.5
+        )
+        base = np.where(state_codes == self.STATE_OFF, min_value, base)
+        values = base + self._rng.standard_normal(len(base)) * noise
+        return np.round(np.clip(values, min_value, max_value), 2)
+
+
 def create_sensor_generators(cell_type: str) -> Dict[str, SensorGenerator]:
     """Create sensor generators for a cell type."""
     generators = {}
@@ -1788,7 +2014,7 @@ def create_sensor_generators(cell_type: str) -> Dict[str, SensorGenerator]:
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
     """Represents a manufacturing job with rich stateful data.
 
@@ -2051,42 +2277,48 @@ class JobGenerator:
         "agv": "Transport",
     }
 
-    def __init__(self, templates: List[Dict], customers: Optional[List[str]] = None):
+    def __init__(
+        self,
+        templates: List[Dict],
+        customers: Optional[List[str]] = None,
+        rng: Optional[random.Random] = None,
+    ):
         self.templates = templates
         self.customers = customers  # Legacy support
+        self._random = rng if rng is not None else random
         self._job_counter = 9940  # Start from JOB_9940
 
     def generate_job(self) -> Job:
         """Generate a new job with rich data from templates."""
-        template = random.choice(self.templates) if self.templates else {}
+        template = self._random.choice(self.templates) if self.templates else {}
         self._job_counter += 1
 
         job_id = f"JOB_{self._job_counter}"
-        qty = random.randint(
+        qty = self._random.randint(
             template.get("qty_range", (50, 200))[0],
             template.get("qty_range", (50, 200))[1],
         )
 
         # Select customer
         if self.customers:
-            customer = random.choice(self.customers)
+            customer = self._random.choice(self.customers)
             customer_id = ""
         else:
-            customer_id, customer = random.choice(self.CUSTOMERS)
+            customer_id, customer = self._random.choice(self.CUSTOMERS)
 
         # Calculate pricing and estimates
-        estimated_hours = qty * random.uniform(0.02, 0.1)  # 1.2-6 min per part
-        material_cost = qty * random.uniform(2, 15)
+        estimated_hours = qty * self._random.uniform(0.02, 0.1)  # 1.2-6 min per part
+        material_cost = qty * self._random.uniform(2, 15)
         labor_cost = estimated_hours * 55.0  # €55/hour rate
-        margin = random.uniform(0.25, 0.40)
+        margin = self._random.uniform(0.25, 0.40)
         quoted_price = (material_cost + labor_cost) / (1 - margin)
         margin_pct = round(margin * 100, 1)
 
         # Scheduling
         now = datetime.now()
-        scheduled_start = now + timedelta(days=random.randint(0, 3))
-        due_date = now + timedelta(days=random.randint(3, 14))
-        scheduled_end = due_date - timedelta(hours=random.randint(4, 24))
+        scheduled_start = now + timedelta(days=self._random.randint(0, 3))
+        due_date = now + timedelta(days=self._random.randint(3, 14))
+        scheduled_end = due_date - timedelta(hours=self._random.randint(4, 24))
 
         # Get routing from template
         routing = template.get("routing", ["laser_01"])
@@ -2101,7 +2333,7 @@ class JobGenerator:
             job_name=f"{template.get('name', 'Custom Part')} Batch {self._job_counter % 100}",
             customer=customer,
             customer_id=customer_id,
-            priority=random.choices(
+            priority=self._random.choices(
                 list(JobPriority),
                 weights=[0.3, 0.5, 0.15, 0.05],
             )[0],
@@ -2112,7 +2344,7 @@ class JobGenerator:
             scheduled_start=scheduled_start,
             scheduled_end=scheduled_end,
             due_date=due_date,
-            sales_order_number=f"SO-{random.randint(50000, 59999)}",
+            sales_order_number=f"SO-{self._random.randint(50000, 59999)}",
 
             # Time estimates
             estimated_hours=round(estimated_hours, 1),
@@ -2125,7 +2357,7 @@ class JobGenerator:
             margin_pct=margin_pct,
 
             # Material info
-            item_number=f"PN-{random.randint(10000, 99999)}",
+            item_number=f"PN-{self._random.randint(10000, 99999)}",
             material_spec=material_spec,
             sheet_thickness_mm=thickness,
         )
@@ -2139,7 +2371,7 @@ class JobGenerator:
         job.current_cell = cell_id
         job.started_at = job.started_at or now
         job.operation_started_at = now
-        job.released_at = job.released_at or (now - timedelta(hours=random.randint(1, 24)))
+        job.released_at = job.released_at or (now - timedelta(hours=self._random.randint(1, 24)))
 
         # Set operation name based on cell type
         for cell_type, op_name in self.OPERATION_NAMES.items():
@@ -2189,39 +2421,44 @@ class JobGenerator:
 class ERPMESGenerator:
     """Generates ERP/MES enrichment data."""
 
+    rng: Optional[random.Random] = None
+
+    def __post_init__(self) -> None:
+        self._random = self.rng if self.rng is not None else random
+
     def generate_energy_metrics(self, cells_data: List[Dict]) -> Dict[str, Any]:
         """Generate energy consumption metrics."""
-        total_kwh = sum(c.get("power_kw", 10) for c in cells_data) * (random.uniform(0.8, 1.2))
+        total_kwh = sum(c.get("power_kw", 10) for c in cells_data) * (self._random.uniform(0.8, 1.2))
 
         return {
             "kwh_today": round(total_kwh * 8, 1),  # Assume 8-hour shift
             "kwh_this_shift": round(total_kwh * 4, 1),
             "cost_per_kwh_eur": 0.15,
             "total_cost_today_eur": round(total_kwh * 8 * 0.15, 2),
-            "avg_cost_per_order_eur": round(random.uniform(8, 18), 2),
+            "avg_cost_per_order_eur": round(self._random.uniform(8, 18), 2),
             "timestamp_ms": int(time.time() * 1000),
         }
 
     def generate_quality_metrics(self, cell_id: str) -> Dict[str, Any]:
         """Generate quality metrics for a cell."""
-        quality_pct = random.gauss(98.5, 1.0)
+        quality_pct = self._random.gauss(98.5, 1.0)
         quality_pct = max(90.0, min(100.0, quality_pct))
 
         return {
             "cell_id": cell_id,
             "quality_pct": round(quality_pct, 1),
             "defect_rate_pct": round(100 - quality_pct, 2),
-            "scrap_count_today": random.randint(0, 15),
-            "rework_count_today": random.randint(0, 8),
-            "first_pass_yield_pct": round(quality_pct - random.uniform(0, 2), 1),
+            "scrap_count_today": self._random.randint(0, 15),
+            "rework_count_today": self._random.randint(0, 8),
+            "first_pass_yield_pct": round(quality_pct - self._random.uniform(0, 2), 1),
             "timestamp_ms": int(time.time() * 1000),
         }
 
     def generate_oee_metrics(self, cell_id: str) -> Dict[str, Any]:
         """Generate OEE metrics for a cell."""
-        availability = random.gauss(92, 4)
-        performance = random.gauss(88, 5)
-        quality = random.gauss(98, 1.5)
+        availability = self._random.gauss(92, 4)
+        performance = self._random.gauss(88, 5)
+        quality = self._random.gauss(98, 1.5)
 
         availability = max(70, min(100, availability))
         performance = max(60, min(100, performance))
@@ -2235,8 +2472,8 @@ class ERPMESGenerator:
             "availability_pct": round(availability, 1),
             "performance_pct": round(performance, 1),
             "quality_pct": round(quality, 1),
-            "idle_time_min": random.randint(5, 45),
-            "downtime_min": random.randint(0, 30),
+            "idle_time_min": self._random.randint(5, 45),
+            "downtime_min": self._random.randint(0, 30),
             "period": "SHIFT",
             "timestamp_ms": int(time.time() * 1000),
         }
@@ -2249,9 +2486,9 @@ class ERPMESGenerator:
         return {
             "on_time_pct": round(on_time / total * 100, 1) if total > 0 else 100.0,
             "late_orders": max(0, total - on_time),
-            "orders_shipping_today": random.randint(3, 12),
-            "orders_due_this_week": random.randint(15, 40),
-            "avg_lead_time_days": round(random.uniform(3, 8), 1),
+            "orders_shipping_today": self._random.randint(3, 12),
+            "orders_due_this_week": self._random.randint(15, 40),
+            "avg_lead_time_days": round(self._random.uniform(3, 8), 1),
             "timestamp_ms": int(time.time() * 1000),
         }
 
@@ -2260,21 +2497,21 @@ class ERPMESGenerator:
         wip_value = sum(j.material_cost * (j.qty_complete / j.qty_target) for j in jobs if j.status == JobStatus.IN_PROGRESS)
 
         return {
-            "wip_value_eur": round(wip_value, 0) if wip_value > 0 else random.randint(25000, 50000),
+            "wip_value_eur": round(wip_value, 0) if wip_value > 0 else self._random.randint(25000, 50000),
             "wip_orders": len([j for j in jobs if j.status == JobStatus.IN_PROGRESS]),
-            "inventory_turns_yr": round(random.uniform(10, 15), 1),
-            "raw_material_value_eur": random.randint(80000, 150000),
-            "finished_goods_value_eur": random.randint(30000, 70000),
+            "inventory_turns_yr": round(self._random.uniform(10, 15), 1),
+            "raw_material_value_eur": self._random.randint(80000, 150000),
+            "finished_goods_value_eur": self._random.randint(30000, 70000),
             "timestamp_ms": int(time.time() * 1000),
         }
 
     def generate_machine_utilization(self, cells_states: Dict[str, PackMLState]) -> Dict[str, Any]:
         """Generate machine utilization metrics."""
-        running = sum(1 for s in cells_states.values() if s == PackMLState.EXECUTE)
+        running = list(cells_states.values()).count(PackMLState.EXECUTE)
         total = len(cells_states) if cells_states else 1
 
         # Find bottleneck (random for simulation)
-        bottleneck = random.choice(list(cells_states.keys())) if cells_states else "press_brake_02"
+        bottleneck = self._random.choice(list(cells_states.keys())) if cells_states else "press_brake_02"
 
         return {
             "fleet_utilization_pct": round(running / total * 100, 1) if total > 0 else 0,
@@ -2282,20 +2519,20 @@ class ERPMESGenerator:
             "machines_total": total,
             "machines_idle": total - running,
             "bottleneck_cell": bottleneck,
-            "bottleneck_queue_hours": round(random.uniform(2, 12), 1),
+            "bottleneck_queue_hours": round(self._random.uniform(2, 12), 1),
             "timestamp_ms": int(time.time() * 1000),
         }
 
     def generate_quote_metrics(self) -> Dict[str, Any]:
         """Generate quotation metrics."""
         return {
-            "quote_id": f"QUOTE_{random.randint(9900, 9999)}",
-            "margin_pct": round(random.uniform(25, 45), 1),
-            "est_vs_actual_hours": round(random.gauss(0, 3), 1),
-            "quotes_pending": random.randint(5, 20),
-            "quotes_won_this_month": random.randint(10, 35),
-            "win_rate_pct": round(random.uniform(35, 55), 1),
-            "avg_quote_value_eur": random.randint(2000, 15000),
+            "quote_id": f"QUOTE_{self._random.randint(9900, 9999)}",
+            "margin_pct": round(self._random.uniform(25, 45), 1),
+            "est_vs_actual_hours": round(self._random.gauss(0, 3), 1),
+            "quotes_pending": self._random.randint(5, 20),
+            "quotes_won_this_month": self._random.randint(10, 35),
+            "win_rate_pct": round(self._random.uniform(35, 55), 1),
+            "avg_quote_value_eur": self._random.randint(2000, 15000),
             "timestamp_ms": int(time.time() * 1000),
         }
 
@@ -2312,13 +2549,13 @@ class ERPMESGenerator:
             },
             "jobs": {
                 "active": len(active_jobs),
-                "completed_today": random.randint(8, 25),
-                "on_time_pct": round(random.uniform(90, 99), 1),
+                "completed_today": self._random.randint(8, 25),
+                "on_time_pct": round(self._random.uniform(90, 99), 1),
             },
             "production": {
-                "parts_today": random.randint(300, 800),
-                "scrap_pct": round(random.uniform(0.5, 3.0), 1),
-                "throughput_per_hour": random.randint(30, 80),
+                "parts_today": self._random.randint(300, 800),
+                "scrap_pct": round(self._random.uniform(0.5, 3.0), 1),
+                "throughput_per_hour": self._random.randint(30, 80),
             },
             "machines": {
                 "running": sum(1 for s in cells_states.values() if s == PackMLState.EXECUTE),
@@ -2329,8 +2566,8 @@ class ERPMESGenerator:
                 ),
             },
             "energy": {
-                "kwh_today": random.randint(600, 1200),
-                "cost_eur": round(random.randint(600, 1200) * 0.15, 2),
+                "kwh_today": self._random.randint(600, 1200),
+                "cost_eur": round(self._random.randint(600, 1200) * 0.15, 2),
             },
             "_updated_at": datetime.now().isoformat() + "Z",
         }
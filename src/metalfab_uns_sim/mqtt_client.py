@@ -6,7 +6,7 @@ import threading
 import time
 from dataclasses import dataclass, field
 from queue import Queue, Empty
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import paho.mqtt.client as mqtt
 
@@ -16,12 +16,21 @@ from .config import MQTTConfig, UNSConfig
 logger = logging.getLogger(__name__)
 
 
+# Compact separators keep payload buffers (and wire size) small
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    """Serialize a payload to UTF-8 JSON bytes, ready to hand to paho."""
+    return _ENCODER.encode(payload).encode()
+
+
 @dataclass
 class Message:
     """MQTT message to be published."""
 
     topic: str
-    payload: Dict[str, Any]
+    payload: Union[Dict[str, Any], bytes]  # bytes are already-serialized JSON
     retain: bool = False
     qos: int = 1
 
@@ -44,17 +53,24 @@ class MQTTClient:
     ):
         self.mqtt_config = mqtt_config
         self.uns_config = uns_config
+        # UNS settings are fixed once the client exists, so join the prefix once
+        self._base_topic = f"{uns_config.topic_prefix}/{uns_config.enterprise}/{uns_config.site}"
         self.on_level_change = on_level_change
         self.on_site_toggle = on_site_toggle
 
         self._client: Optional[mqtt.Client] = None
         self._connected = False
         self._current_level = ComplexityLevel.LEVEL_2_STATEFUL
-        self._publish_queue: Queue[Message] = Queue()
+        # Items are single messages or whole publish_many() batches
+        self._publish_queue: Queue[Union[Message, List[Message]]] = Queue()
         self._publish_thread: Optional[threading.Thread] = None
         self._running = False
         self._dry_run = False
 
+        # Last retained payload sent per topic; identical retained payloads are
+        # skipped since the broker already holds them
+        self._last_retained: Dict[str, bytes] = {}
+
         # Stats
         self._messages_published = 0
         self._messages_dropped = 0
@@ -70,7 +86,7 @@ class MQTTClient:
     @property
     def base_topic(self) -> str:
         """Get the base topic path."""
-        return f"{self.uns_config.topic_prefix}/{self.uns_config.enterprise}/{self.uns_config.site}"
+        return self._base_topic
 
     def connect(self, dry_run: bool = False) -> bool:
         """Connect to the MQTT broker."""
@@ -148,6 +164,7 @@ class MQTTClient:
             return
 
         logger.info("Clearing all retained topics...")
+        self._last_retained.clear()
 
         # Topic patterns to clear (all UNS namespaces)
         topic_patterns = [
@@ -227,7 +244,7 @@ class MQTTClient:
             try:
                 self._client.publish(topic, payload=None, qos=1, retain=True)
             except Exception as e:
-                logger.debug(f"Could not clear {topic}: {e}")
+                logger.debug("Could not clear %s: %s", topic, e)
 
     def publish(
         self,
@@ -235,12 +252,62 @@ class MQTTClient:
         payload: Dict[str, Any],
         retain: bool = False,
         required_level: ComplexityLevel = ComplexityLevel.LEVEL_1_SENSORS,
+        qos: Optional[int] = None,
+    ) -> bool:
+        """Queue a message for publishing if current level allows it.
+
+        ``qos`` overrides the configured QoS, e.g. QoS 0 for _raw telemetry.
+        """
+        if self._current_level < required_level:
+            return False
+
+        full_topic = f"{self._base_topic}/{topic}"
+        if qos is None:
+            qos = self.mqtt_config.qos
+        msg = Message(topic=full_topic, payload=payload, retain=retain, qos=qos)
+        self._publish_queue.put(msg)
+        return True
+
+    def publish_many(
+        self,
+        messages: Iterable[Tuple[str, Union[Dict[str, Any], bytes]]],
+        retain: bool = False,
+        required_level: ComplexityLevel = ComplexityLevel.LEVEL_1_SENSORS,
+        qos: Optional[int] = None,
+    ) -> bool:
+        """Queue a batch of (topic, payload) pairs sharing one level gate.
+
+        The level is checked once for the whole batch, and the batch is queued
+        as one item so the publish thread takes the queue lock once for it.
+        A payload dict passed for several topics in the same batch is serialized
+        once by the publish thread; payloads may also be pre-serialized JSON bytes.
+        """
+        if self._current_level < required_level:
+            return False
+
+        base_topic = self._base_topic
+        if qos is None:
+            qos = self.mqtt_config.qos
+        batch = [
+            Message(topic=f"{base_topic}/{topic}", payload=payload, retain=retain, qos=qos)
+            for topic, payload in messages
+        ]
+        if batch:
+            self._publish_queue.put(batch)
+        return True
+
+    def publish_bytes(
+        self,
+        topic: str,
+        payload: bytes,
+        retain: bool = False,
+        required_level: ComplexityLevel = ComplexityLevel.LEVEL_1_SENSORS,
     ) -> bool:
-        """Queue a message for publishing if current level allows it."""
+        """Queue an already-serialized JSON payload, skipping the encode step."""
         if self._current_level < required_level:
             return False
 
-        full_topic = f"{self.base_topic}/{topic}"
+        full_topic = f"{self._base_topic}/{topic}"
         msg = Message(topic=full_topic, payload=payload, retain=retain, qos=self.mqtt_config.qos)
         self._publish_queue.put(msg)
         return True
@@ -273,27 +340,55 @@ class MQTTClient:
         """Background thread that publishes queued messages."""
         while self._running:
             try:
-                msg = self._publish_queue.get(timeout=0.1)
-                self._do_publish(msg)
+                item = self._publish_queue.get(timeout=0.1)
+                if isinstance(item, list):
+                    self._publish_batch(item)
+                else:
+                    self._do_publish(item)
             except Empty:
                 continue
 
+    def _publish_batch(self, batch: List[Message]) -> None:
+        """Publish a publish_many() batch, serializing each shared payload dict once."""
+        # The batch holds every payload alive, so ids cannot be reused within it
+        encoded: Dict[int, bytes] = {}
+        for msg in batch:
+            if not isinstance(msg.payload, bytes):
+                key = id(msg.payload)
+                payload = encoded.get(key)
+                if payload is None:
+                    payload = encoded[key] = _dumps(msg.payload)
+                msg.payload = payload
+            self._do_publish(msg)
+
     def _do_publish(self, msg: Message) -> None:
         """Actually publish a message."""
-        payload_str = json.dumps(msg.payload)
+        # Encode to bytes here so paho publishes the buffer without re-encoding
+        payload = msg.payload if isinstance(msg.payload, bytes) else _dumps(msg.payload)
+
+        # Compare the bytes themselves, so no collision can drop a changed payload
+        if msg.retain and self._last_retained.get(msg.topic) == payload:
+            return
 
         if self._dry_run:
-            logger.debug(f"[DRY RUN] {msg.topic}: {payload_str[:100]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[DRY RUN] %s: %s", msg.topic, payload[:100].decode(errors="replace")
+                )
             self._messages_published += 1
+            if msg.retain:
+                self._last_retained[msg.topic] = payload
             return
 
         if self._client and self._connected:
             try:
                 result = self._client.publish(
-                    msg.topic, payload_str, qos=msg.qos, retain=msg.retain
+                    msg.topic, payload, qos=msg.qos, retain=msg.retain
                 )
                 if result.rc == mqtt.MQTT_ERR_SUCCESS:
                     self._messages_published += 1
+                    if msg.retain:
+                        self._last_retained[msg.topic] = payload
                 else:
                     self._messages_dropped += 1
                     logger.warning(f"Failed to publish to {msg.topic}: {result.rc}")
@@ -345,6 +440,8 @@ class MQTTClient:
         """Handle connection callback."""
         if rc == 0:
             self._connected = True
+            # The broker may have lost retained state; resend everything once
+            self._last_retained.clear()
             logger.info("Connected to MQTT broker")
         else:
             logger.error(f"Connection failed with code {rc}")
@@ -40,6 +40,7 @@ Control Topics (root level - for demo control):
 import json
 import logging
 import random
+import re
 import signal
 import sys
 import threading
@@ -47,6 +48,7 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -82,6 +84,10 @@ IDEAL_CYCLE_RATES = {  # parts per hour (ideal, no losses)
 
 SHIFT_DURATION_S = 8 * 3600  # 8-hour shift
 
+# CamelCase word boundaries for converting sensor names to _raw tag names
+_ACRONYM_BOUNDARY = re.compile(r'([A-Z]+)([A-Z][a-z])')
+_WORD_BOUNDARY = re.compile(r'([a-z\d])([A-Z])')
+
 
 # =============================================================================
 # Machine State
@@ -870,11 +876,14 @@ class SemanticPublisher:
         self.publish(f"{base}/Asset/MachineType", machine.machine_type)
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def _to_raw_tag(name: str) -> str:
-        """Convert CamelCase sensor name to snake_case _raw tag name."""
-        import re
-        s1 = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1_\2', name)
-        return re.sub(r'([a-z\d])([A-Z])', r'\1_\2', s1).lower().replace(" ", "_")
+        """Convert CamelCase sensor name to snake_case _raw tag name.
+
+        Sensor names come from a fixed set, so results are cached.
+        """
+        s1 = _ACRONYM_BOUNDARY.sub(r'\1_\2', name)
+        return _WORD_BOUNDARY.sub(r'\1_\2', s1).lower().replace(" ", "_")
 
     def publish_machine_functional(self, site_id: str, machine: Machine):
         """Publish Edge/ and Line/ namespaces - real-time operational data."""
@@ -15,14 +15,19 @@ Includes realistic simulation of:
 - Inventory tracking
 """
 
+import heapq
 import logging
 import math
 import random
 import threading
 import time
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from .complexity import ComplexityLevel, get_features_for_level
 from .config import Config, CellConfig
@@ -34,6 +39,7 @@ from .generators import (
     JobStatus,
     MachineSubState,
     PackMLState,
+    SensorBatchGenerator,
     SensorGenerator,
     create_sensor_generators,
     # New generators
@@ -50,6 +56,7 @@ from .generators import (
     PowderCoatingLine,
     PowderCoatingZone,
     RAL_COLORS,
+    RAL_COLOR_DICTS,
 )
 from .mqtt_client import MQTTClient
 from .digital_passport import (
@@ -61,8 +68,16 @@ from .digital_passport import (
 
 logger = logging.getLogger(__name__)
 
+# Transport waypoints an AGV may be dispatched to (docks/charger excluded)
+_WAYPOINT_POOL = ("A", "B", "C", "D", "E", "F")
+# After charging, AGVs return to the main aisle (no FINISHING pickup)
+_WAYPOINT_POOL_NO_F = ("A", "B", "C", "D", "E")
+
+# AGV cruise speeds are drawn from NumPy in blocks of this size
+_AGV_SPEED_BLOCK = 256
+
 
-@dataclass
+@dataclass(slots=True)
 class CellState:
     """Runtime state for a machine cell."""
 
@@ -71,11 +86,13 @@ class CellState:
     sub_state: MachineSubState = MachineSubState.NONE
     current_job: Optional[Job] = None
     operator_id: Optional[str] = None
-    state_since: datetime = field(default_factory=datetime.now)
+    state_since: datetime = field(default_factory=datetime.now)  # Wall clock, for reporting
+    state_since_mono: float = field(default_factory=time.monotonic)  # For elapsed-time checks
     cycle_count: int = 0
     parts_produced: int = 0
     parts_scrap: int = 0
     sensors: Dict[str, SensorGenerator] = field(default_factory=dict)
+    operation_power_kw: float = 10.0  # Average draw used for DPP energy estimates
 
     # AGV specific
     position_x: float = 0.0
@@ -84,13 +101,66 @@ class CellState:
     target_y: float = 0.0
     battery_pct: float = 100.0
 
+    def mark_state_change(
+        self, now: Optional[datetime] = None, now_mono: Optional[float] = None
+    ) -> None:
+        """Record that the cell just entered a new state (defaults to the current time)."""
+        self.state_since = now or datetime.now()
+        self.state_since_mono = time.monotonic() if now_mono is None else now_mono
+
+    def seconds_in_state(self, now_mono: Optional[float] = None) -> float:
+        """Seconds elapsed since the cell entered its current state (defaults to now)."""
+        if now_mono is None:
+            now_mono = time.monotonic()
+        return now_mono - self.state_since_mono
+
 
 class Simulator:
     """Main simulator class orchestrating all components."""
 
+    # Production sub-state entered when a cell starts executing
+    _SUB_STATE_BY_TYPE = {
+        "laser_cutter": MachineSubState.CUTTING,
+        "press_brake": MachineSubState.BENDING,
+        "robot_weld": MachineSubState.WELDING,
+        "paint_booth": MachineSubState.PAINTING,
+    }
+
+    # Average power consumption by machine type (kW)
+    _POWER_RATINGS = {
+        "laser_cutter": 25.0,
+        "press_brake": 15.0,
+        "robot_weld": 8.0,
+        "powder_coating_line": 45.0,
+        "assembly": 2.0,
+        "agv": 1.5,
+    }
+
+    # Operator statuses that _update_operators can move out of
+    _OPERATOR_ACTIVE_STATUSES = frozenset({
+        OperatorStatus.CLOCKED_OUT,
+        OperatorStatus.CLOCKED_IN,
+        OperatorStatus.AT_MACHINE,
+        OperatorStatus.ON_BREAK,
+    })
+
+    # DPP operation type recorded for each cell type
+    _CELL_TO_OP_TYPE = {
+        "laser_cutter": "LASER_CUTTING",
+        "press_brake": "PRESS_FORMING",
+        "robot_weld": "ROBOTIC_WELDING",
+        "powder_coating_line": "POWDER_COATING",
+        "assembly": "ASSEMBLY",
+    }
+
     def __init__(self, config: Config, mqtt_client: Optional[MQTTClient] = None):
         self.config = config
+        # Own RNG, so a configured seed doesn't reseed the process-wide random module
+        self._random = random.Random(config.simulation.random_seed)
         self._level = ComplexityLevel(config.simulation.initial_level)
+        self._capture_clock()
+        self._features_level: Optional[ComplexityLevel] = None
+        self._refresh_features()
         self._running = False
         self._tick_thread: Optional[threading.Thread] = None
         self._sites_enabled: Dict[str, bool] = {}
@@ -109,9 +179,17 @@ class Simulator:
         # Initialize cell states
         self._cells: Dict[str, CellState] = {}
         self._init_cells()
+        self._cell_ids = tuple(self._cells)
 
-        # Initialize job management
+        # Initialize job management; register jobs only via _add_job so the
+        # dispatch indexes below stay in step with _jobs
         self._jobs: Dict[str, Job] = {}
+        # Queued jobs waiting on each cell, in queue order (cell_id -> jobs)
+        self._queued_by_cell: Dict[str, Deque[Job]] = defaultdict(deque)
+        # Newly generated jobs awaiting release to the queue
+        self._created_jobs: List[Job] = []
+        # Shipped jobs pending removal, as a heap of (monotonic deadline, job_id)
+        self._ship_gc_heap: List[Tuple[float, str]] = []
         self._job_generator = JobGenerator(
             templates=[
                 {
@@ -124,21 +202,23 @@ class Simulator:
                 for t in config.job_templates
             ],
             customers=config.customers,
+            rng=self._random,
         )
 
         # Initialize ERP/MES generator
-        self._erp_mes = ERPMESGenerator()
+        self._erp_mes = ERPMESGenerator(rng=self._random)
 
         # Initialize new generators
-        self._operator_gen = OperatorGenerator(num_operators=12)
-        self._solar_gen = SolarGenerator()
-        self._production_order_gen = ProductionOrderGenerator()
-        self._inventory_gen = InventoryGenerator()
+        self._operator_gen = OperatorGenerator(num_operators=12, rng=self._random)
+        self._solar_gen = SolarGenerator(rng=self._random)
+        self._production_order_gen = ProductionOrderGenerator(rng=self._random)
+        self._inventory_gen = InventoryGenerator(rng=self._random)
 
         # Digital Product Passports (Level 4)
         self._dpp_generator = DPPGenerator(
             grid_carbon_intensity=350.0,  # EU average g CO2/kWh
-            renewable_pct=30.0  # EU renewable energy %
+            renewable_pct=30.0,  # EU renewable energy %
+            rng=self._random,
         )
         self._digital_passports: Dict[str, DigitalProductPassport] = {}  # job_id -> DPP
         self._dpp_events: List[Dict[str, Any]] = []  # Recent events for external subscribers
@@ -147,39 +227,48 @@ class Simulator:
         self._asset_metadata = {}
         self._init_asset_metadata()
 
+        # Vectorised random draws (AGV speeds, rare-event scheduling)
+        self._rng = np.random.default_rng(config.simulation.random_seed)
+        self._init_sensor_batch()
+
         # AGV fleet state
         self._agv_positions: Dict[str, AGVPosition] = {}
+        self._agv_speed_pool: List[float] = []
+        self._agv_undock_tick: Dict[str, int] = {}  # agv_id -> tick a docked AGV leaves
         self._init_agv_positions()
 
         # Shared Powder Coating Line (located in Eindhoven, serves all facilities)
         self._powder_coating_line = PowderCoatingLine(
             line_id="COAT_LINE_01",
-            location="eindhoven"
+            location="eindhoven",
+            rng=self._random,
         )
 
         # Timing
         self._tick_count = 0
         self._last_job_time = 0.0
-        self._job_interval = random.randint(30, 90)  # New job every 30-90s (faster for demo)
-        self._shift_check_time = 0.0
+        self._job_interval = self._random.randint(30, 90)  # New job every 30-90s (faster for demo)
+        self._next_shift_check_mono = 0.0  # First check runs on the first tick
+        # Rare per-tick events are scheduled by geometric skip instead of rolled every tick
+        self._next_color_change_tick = self._schedule_rare_event(0.001)
 
         # Random update intervals (10-60 seconds) for ERP/MES/Dashboard data
         self._last_erp_time = 0.0
-        self._erp_interval = random.uniform(10, 60)
+        self._erp_interval = self._random.uniform(10, 60)
         self._last_mes_quality_time = 0.0
-        self._mes_quality_interval = random.uniform(10, 60)
+        self._mes_quality_interval = self._random.uniform(10, 60)
         self._last_oee_time = 0.0
-        self._oee_interval = random.uniform(10, 60)
+        self._oee_interval = self._random.uniform(10, 60)
         self._last_delivery_time = 0.0
-        self._delivery_interval = random.uniform(10, 60)
+        self._delivery_interval = self._random.uniform(10, 60)
         self._last_inventory_time = 0.0
-        self._inventory_interval = random.uniform(10, 60)
+        self._inventory_interval = self._random.uniform(10, 60)
         self._last_dashboard_time = 0.0
-        self._dashboard_interval = random.uniform(10, 60)
+        self._dashboard_interval = self._random.uniform(10, 60)
         self._last_analytics_time = 0.0
-        self._analytics_interval = random.uniform(60, 180)  # Analytics stays longer
+        self._analytics_interval = self._random.uniform(60, 180)  # Analytics stays longer
         self._last_powder_planning_time = 0.0
-        self._powder_planning_interval = random.uniform(10, 60)
+        self._powder_planning_interval = self._random.uniform(10, 60)
 
     def _init_asset_metadata(self) -> None:
         """Initialize asset metadata for all cells."""
@@ -206,29 +295,40 @@ class Simulator:
         for cell_id, cell in self._cells.items():
             if cell.config.cell_type == "agv":
                 # Start at random waypoint
-                start_wp = random.choice(["A", "B", "C", "D", "E", "F"])
+                start_wp = self._random.choice(_WAYPOINT_POOL)
                 start_x, start_y, start_zone = waypoints[start_wp]
 
                 # Random target
-                target_wp = random.choice(["A", "B", "C", "D", "E", "F"])
+                target_wp = self._random.choice(_WAYPOINT_POOL)
 
                 self._agv_positions[cell_id] = AGVPosition(
                     agv_id=cell_id,
                     x=start_x,
                     y=start_y,
-                    heading_deg=random.uniform(0, 360),
+                    heading_deg=self._random.uniform(0, 360),
                     current_waypoint=start_wp,
                     target_waypoint=target_wp,
                     path=f"{start_wp}→{target_wp}",
                     zone=start_zone,
                     status="IDLE",
-                    battery_pct=random.uniform(70, 100),
+                    battery_pct=self._random.uniform(70, 100),
                     max_payload_kg=250.0,
                 )
 
         # Store waypoints for later use
         self._agv_waypoints = waypoints
 
+    def _schedule_rare_event(self, p: float) -> int:
+        """Tick on which an event with per-tick probability ``p`` next fires."""
+        return self._tick_count + int(self._rng.geometric(p))
+
+    def _next_agv_speed(self) -> float:
+        """Next AGV cruise speed (m/s): N(1.5, 0.2) clipped to 0.5-2.0, drawn in blocks."""
+        if not self._agv_speed_pool:
+            speeds = self._rng.normal(1.5, 0.2, _AGV_SPEED_BLOCK)
+            self._agv_speed_pool = np.clip(speeds, 0.5, 2.0).tolist()
+        return self._agv_speed_pool.pop()
+
     @property
     def level(self) -> ComplexityLevel:
         return self._level
@@ -236,8 +336,28 @@ class Simulator:
     @level.setter
     def level(self, value: ComplexityLevel):
         self._level = value
+        self._refresh_features()
         self._mqtt.set_level(value)
 
+    def _capture_clock(self) -> None:
+        """Read the clocks once; tick-driven updates share these timestamps."""
+        self._now_s = time.time()
+        self._now_dt = datetime.fromtimestamp(self._now_s)
+        self._now_ms = int(self._now_s * 1000)
+        self._now_mono = time.monotonic()
+
+    def _refresh_features(self) -> None:
+        """Recompute cached feature flags if the level changed since last refresh."""
+        if self._level is self._features_level:
+            return
+        self._features_level = self._level
+        self._features = get_features_for_level(self._level)
+        self._dpp_enabled = self._features.dpp
+        # Level gates checked before batched payloads are built; calls still pass required_level
+        self._emit_l1 = self._level >= ComplexityLevel.LEVEL_1_SENSORS
+        self._emit_l2 = self._level >= ComplexityLevel.LEVEL_2_STATEFUL
+        self._emit_l3 = self._level >= ComplexityLevel.LEVEL_3_ERP_MES
+
     def _init_cells(self) -> None:
         """Initialize cell states from config."""
         first_site = True
@@ -251,16 +371,37 @@ class Simulator:
                 self._cells[cell_config.id] = CellState(
                     config=cell_config,
                     sensors=sensors,
-                    operator_id=f"OP_{random.randint(100, 999)}",
+                    operator_id=f"OP_{self._random.randint(100, 999)}",
+                    operation_power_kw=self._POWER_RATINGS.get(cell_config.cell_type, 10.0),
                 )
         logger.info(f"Initialized {len(self._cells)} cells across {len(self._sites_enabled)} sites.")
         enabled_sites = [site for site, enabled in self._sites_enabled.items() if enabled]
         logger.info(f"Enabled sites: {enabled_sites}")
 
+    def _init_sensor_batch(self) -> None:
+        """Lay out every cell's sensors in one batch generator with fixed topics."""
+        generators: List[SensorGenerator] = []
+        self._sensor_topics: List[str] = []
+        self._sensor_slices: List[Tuple[CellState, int, int]] = []
+        for cell_id, cell in self._cells.items():
+            start = len(generators)
+            for sensor_id, generator in cell.sensors.items():
+                generators.append(generator)
+                self._sensor_topics.append(f"{cell.config.area_id}/{cell_id}/_raw/process/{sensor_id}")
+            self._sensor_slices.append((cell, start, len(generators)))
+        self._sensor_batch = SensorBatchGenerator(generators, rng=self._rng)
+
+        # Rated power per cell for the ERP energy summary; fixed once sensors exist
+        self._energy_cells_data = [
+            {"power_kw": cell.sensors.get("power_kw", SensorGenerator("power_kw")).base_value}
+            for cell in self._cells.values()
+        ]
+
     def _on_level_change(self, level: ComplexityLevel) -> None:
         """Handle complexity level changes from MQTT."""
         old_level = self._level
         self._level = level
+        self._refresh_features()
         logger.info(f"Level changed to {level.name}")
         self._publish_simulator_status()
 
@@ -335,7 +476,7 @@ class Simulator:
 
                 # Add randomization (jitter) to make timing more realistic
                 if jitter_pct > 0:
-                    jitter = random.uniform(-jitter_pct, jitter_pct)
+                    jitter = self._random.uniform(-jitter_pct, jitter_pct)
                     actual_interval = base_interval * (1.0 + jitter)
                 else:
                     actual_interval = base_interval
@@ -368,8 +509,10 @@ class Simulator:
             return
 
         self._tick_count += 1
-        current_time = time.time()
-        features = get_features_for_level(self._level)
+        self._capture_clock()
+        current_time = self._now_s
+        self._refresh_features()
+        features = self._features
 
         # Level 1: Sensors
         if features.sensors:
@@ -401,41 +544,41 @@ class Simulator:
         if features.erp_job_data and (current_time - self._last_erp_time) >= self._erp_interval:
             self._publish_erp_data()
             self._last_erp_time = current_time
-            self._erp_interval = random.uniform(10, 60)
+            self._erp_interval = self._random.uniform(10, 60)
 
         if features.mes_quality and (current_time - self._last_mes_quality_time) >= self._mes_quality_interval:
             self._publish_mes_quality()
             self._last_mes_quality_time = current_time
-            self._mes_quality_interval = random.uniform(10, 60)
+            self._mes_quality_interval = self._random.uniform(10, 60)
 
         if features.mes_oee and (current_time - self._last_oee_time) >= self._oee_interval:
             self._publish_oee()
             self._last_oee_time = current_time
-            self._oee_interval = random.uniform(10, 60)
+            self._oee_interval = self._random.uniform(10, 60)
 
         if features.delivery_metrics and (current_time - self._last_delivery_time) >= self._delivery_interval:
             self._publish_delivery_metrics()
             self._last_delivery_time = current_time
-            self._delivery_interval = random.uniform(10, 60)
+            self._delivery_interval = self._random.uniform(10, 60)
 
         if features.inventory_wip and (current_time - self._last_inventory_time) >= self._inventory_interval:
             self._publish_inventory()
             self._publish_raw_material_inventory()
             self._last_inventory_time = current_time
-            self._inventory_interval = random.uniform(10, 60)
+            self._inventory_interval = self._random.uniform(10, 60)
 
         # Level 4: Full (random intervals)
         if features.dashboards and (current_time - self._last_dashboard_time) >= self._dashboard_interval:
             self._publish_dashboard()
             self._last_dashboard_time = current_time
-            self._dashboard_interval = random.uniform(10, 60)
+            self._dashboard_interval = self._random.uniform(10, 60)
 
         if features.analytics_advanced and (current_time - self._last_analytics_time) >= self._analytics_interval:
             self._publish_analytics()
             self._last_analytics_time = current_time
-            self._analytics_interval = random.uniform(60, 180)  # Analytics stays longer
+            self._analytics_interval = self._random.uniform(60, 180)  # Analytics stays longer
 
-        if features.events_alarms and random.random() < 0.02:
+        if features.events_alarms and self._random.random() < 0.02:
             self._publish_random_event()
 
         # Powder Coating Line (Level 2+)
@@ -447,17 +590,17 @@ class Simulator:
         if features.erp_job_data and (current_time - self._last_powder_planning_time) >= self._powder_planning_interval:
             self._publish_powder_coating_planning()
             self._last_powder_planning_time = current_time
-            self._powder_planning_interval = random.uniform(10, 60)
+            self._powder_planning_interval = self._random.uniform(10, 60)
 
         # Periodically generate new jobs (faster in Level 4 for DPP demo)
-        if time.time() - self._last_job_time > self._job_interval:
+        if self._now_s - self._last_job_time > self._job_interval:
             self._generate_new_job()
-            self._last_job_time = time.time()
+            self._last_job_time = self._now_s
             # Generate jobs faster at Level 4 to create more DPPs
             if self._level == ComplexityLevel.LEVEL_4_FULL:
-                self._job_interval = random.randint(20, 60)  # Every 20-60s at Level 4
+                self._job_interval = self._random.randint(20, 60)  # Every 20-60s at Level 4
             else:
-                self._job_interval = random.randint(60, 180)  # Every 1-3 min at other levels
+                self._job_interval = self._random.randint(60, 180)  # Every 1-3 min at other levels
 
         # Check for shift changes
         self._check_shift_change()
@@ -500,18 +643,32 @@ class Simulator:
 
     def _publish_sensors(self) -> None:
         """Publish sensor data (Level 1+)."""
-        for cell_id, cell in self._cells.items():
-            if not self._sites_enabled.get(cell.config.area_id, True):
-                continue
-            for sensor_id, generator in cell.sensors.items():
-                reading = generator.generate(cell.state)
-                topic = f"{cell.config.area_id}/{cell_id}/_raw/process/{sensor_id}"
-                self._mqtt.publish(
-                    topic, reading, retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS
-                )
+        now = self._now_s
+        # Only sensors on enabled sites are generated, since only they are published
+        indices: List[int] = []
+        codes: List[int] = []
+        for cell, start, end in self._sensor_slices:
+            if self._sites_enabled.get(cell.config.area_id, True):
+                indices.extend(range(start, end))
+                codes.extend([SensorBatchGenerator.state_code(cell.state)] * (end - start))
+        if not indices:
+            return
+        values = self._sensor_batch.generate_all(np.array(codes), now, indices).tolist()
+        timestamp_ms = int(now * 1000)
+        topics = self._sensor_topics
+
+        for i, value in zip(indices, values):
+            self._mqtt.publish(
+                topics[i],
+                {"timestamp_ms": timestamp_ms, "value": value},
+                retain=False,
+                required_level=ComplexityLevel.LEVEL_1_SENSORS,
+                qos=0,
+            )
 
     def _publish_machine_states(self) -> None:
         """Publish machine states (Level 2+)."""
+        updated_at = self._now_dt.isoformat() + "Z"
         for cell_id, cell in self._cells.items():
             if not self._sites_enabled.get(cell.config.area_id, True):
                 continue
@@ -526,7 +683,7 @@ class Simulator:
                 "cycle_count": cell.cycle_count,
                 "parts_produced": cell.parts_produced,
                 "parts_scrap": cell.parts_scrap,
-                "_updated_at": datetime.now().isoformat() + "Z",
+                "_updated_at": updated_at,
             }
             self._mqtt.publish(
                 topic, payload, retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
@@ -555,11 +712,10 @@ class Simulator:
                 )
 
         # Energy metrics (no retention - transient data)
-        cells_data = [{"power_kw": c.sensors.get("power_kw", SensorGenerator("power_kw")).base_value} for c in self._cells.values()]
         topic = "_erp/energy"
         self._mqtt.publish(
             topic,
-            self._erp_mes.generate_energy_metrics(cells_data),
+            self._erp_mes.generate_energy_metrics(self._energy_cells_data),
             retain=False,
             required_level=ComplexityLevel.LEVEL_3_ERP_MES,
         )
@@ -655,23 +811,23 @@ class Simulator:
             ("SHIFT_CHANGE", "Shift handover completed"),
             ("MAINTENANCE_DUE", "Preventive maintenance scheduled"),
         ]
-        event_type, message = random.choice(event_types)
+        event_type, message = self._random.choice(event_types)
 
         enabled_cells = [
-            cell_id
+            (cell_id, cell)
             for cell_id, cell in self._cells.items()
             if self._sites_enabled.get(cell.config.area_id, True)
         ]
         if not enabled_cells:
             return
-        cell_id = random.choice(enabled_cells)
+        cell_id, cell = self._random.choice(enabled_cells)
 
-        topic = f"{self._cells[cell_id].config.area_id}/{cell_id}/_event"
+        topic = f"{cell.config.area_id}/{cell_id}/_event"
         payload = {
             "event_type": event_type,
             "message": message,
             "cell_id": cell_id,
-            "timestamp_ms": int(time.time() * 1000),
+            "timestamp_ms": self._now_ms,
         }
         self._mqtt.publish(topic, payload, retain=False, required_level=ComplexityLevel.LEVEL_4_FULL)
 
@@ -681,12 +837,16 @@ class Simulator:
 
     def _update_machine_states(self) -> None:
         """Update machine states based on simulation logic."""
+        now_dt = self._now_dt
+        now_mono = self._now_mono
         for cell_id, cell in self._cells.items():
             if not self._sites_enabled.get(cell.config.area_id, True):
                 continue
             if cell.config.cell_type == "agv":
                 continue  # AGVs handled separately
 
+            elapsed = now_mono - cell.state_since_mono
+
             # State machine transitions
             if cell.state == PackMLState.IDLE:
                 # Check if there's a job to process
@@ -696,23 +856,23 @@ class Simulator:
                         cell.current_job = job
                         cell.state = PackMLState.STARTING
                         cell.sub_state = MachineSubState.SETUP
-                        cell.state_since = datetime.now()
+                        cell.mark_state_change(now_dt, now_mono)
 
             elif cell.state == PackMLState.STARTING:
                 # Setup time (simplified: random 5-20 ticks)
-                if (datetime.now() - cell.state_since).seconds > random.randint(5, 20):
+                if elapsed > self._random.randint(5, 20):
                     cell.state = PackMLState.EXECUTE
                     cell.sub_state = self._get_sub_state_for_type(cell.config.cell_type)
-                    cell.state_since = datetime.now()
+                    cell.mark_state_change(now_dt, now_mono)
 
             elif cell.state == PackMLState.EXECUTE:
                 # Production - increment parts
-                if random.random() < 0.3:  # 30% chance per tick to produce a part
+                if self._random.random() < 0.3:  # 30% chance per tick to produce a part
                     cell.parts_produced += 1
                     cell.cycle_count += 1
 
                     # Scrap chance
-                    if random.random() < 0.02:
+                    if self._random.random() < 0.02:
                         cell.parts_scrap += 1
 
                     # Update job progress
@@ -724,38 +884,38 @@ class Simulator:
                         # Check if job complete at this cell
                         if cell.current_job.qty_complete >= cell.current_job.qty_target:
                             cell.state = PackMLState.COMPLETING
-                            cell.state_since = datetime.now()
+                            cell.mark_state_change(now_dt, now_mono)
 
                 # ISA-95/PackML realistic state transitions (more frequent pauses)
-                rand_val = random.random()
+                rand_val = self._random.random()
 
                 # Fault/alarm - HOLDING state (2% chance)
                 if rand_val < 0.02:
                     cell.state = PackMLState.HOLDING
-                    cell.sub_state = random.choice([
+                    cell.sub_state = self._random.choice([
                         MachineSubState.FAULT_CLEARING,
                         MachineSubState.QUALITY_CHECK,
                         MachineSubState.WAITING_MATERIAL,
                         MachineSubState.WAITING_OPERATOR,
                     ])
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} entering HOLDING state: {cell.sub_state.value}")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s entering HOLDING state: %s", cell_id, cell.sub_state.value)
 
                 # Planned suspension - SUSPENDING state (1% chance)
                 elif rand_val < 0.03:
                     cell.state = PackMLState.SUSPENDING
-                    cell.sub_state = random.choice([
+                    cell.sub_state = self._random.choice([
                         MachineSubState.TOOL_CHANGE,
                         MachineSubState.MAINTENANCE,
                         MachineSubState.SETUP,
                     ])
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} entering SUSPENDING state: {cell.sub_state.value}")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s entering SUSPENDING state: %s", cell_id, cell.sub_state.value)
 
             elif cell.state == PackMLState.COMPLETING:
-                if (datetime.now() - cell.state_since).seconds > 3:
+                if elapsed > 3:
                     cell.state = PackMLState.COMPLETED
-                    cell.state_since = datetime.now()
+                    cell.mark_state_change(now_dt, now_mono)
 
             elif cell.state == PackMLState.COMPLETED:
                 # Move job to next operation
@@ -765,72 +925,69 @@ class Simulator:
                 cell.parts_produced = 0
                 cell.parts_scrap = 0
                 cell.state = PackMLState.RESETTING
-                cell.state_since = datetime.now()
+                cell.mark_state_change(now_dt, now_mono)
 
             elif cell.state == PackMLState.RESETTING:
-                if (datetime.now() - cell.state_since).seconds > 2:
+                if elapsed > 2:
                     cell.state = PackMLState.IDLE
                     cell.sub_state = MachineSubState.NONE
-                    cell.state_since = datetime.now()
+                    cell.mark_state_change(now_dt, now_mono)
 
             elif cell.state == PackMLState.HOLDING:
                 # Auto-recover after some time (shorter holds = more state transitions)
-                hold_duration = random.randint(5, 30)  # 5-30 seconds
-                if (datetime.now() - cell.state_since).seconds > hold_duration:
+                hold_duration = self._random.randint(5, 30)  # 5-30 seconds
+                if elapsed > hold_duration:
                     cell.state = PackMLState.UNHOLDING
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} recovering from HOLDING → UNHOLDING")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s recovering from HOLDING → UNHOLDING", cell_id)
 
             elif cell.state == PackMLState.UNHOLDING:
-                if (datetime.now() - cell.state_since).seconds > 2:
+                if elapsed > 2:
                     cell.state = PackMLState.EXECUTE
                     cell.sub_state = self._get_sub_state_for_type(cell.config.cell_type)
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} resumed: UNHOLDING → EXECUTE")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s resumed: UNHOLDING → EXECUTE", cell_id)
 
             elif cell.state == PackMLState.SUSPENDING:
                 # Transition to SUSPENDED after brief suspending period
-                if (datetime.now() - cell.state_since).seconds > 3:
+                if elapsed > 3:
                     cell.state = PackMLState.SUSPENDED
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} now SUSPENDED")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s now SUSPENDED", cell_id)
 
             elif cell.state == PackMLState.SUSPENDED:
                 # Resume after planned intervention (10-45 seconds)
-                suspend_duration = random.randint(10, 45)
-                if (datetime.now() - cell.state_since).seconds > suspend_duration:
+                suspend_duration = self._random.randint(10, 45)
+                if elapsed > suspend_duration:
                     cell.state = PackMLState.UNSUSPENDING
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} resuming from SUSPENDED → UNSUSPENDING")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s resuming from SUSPENDED → UNSUSPENDING", cell_id)
 
             elif cell.state == PackMLState.UNSUSPENDING:
                 # Quick transition back to EXECUTE
-                if (datetime.now() - cell.state_since).seconds > 2:
+                if elapsed > 2:
                     cell.state = PackMLState.EXECUTE
                     cell.sub_state = self._get_sub_state_for_type(cell.config.cell_type)
-                    cell.state_since = datetime.now()
-                    logger.debug(f"{cell_id} back to production: UNSUSPENDING → EXECUTE")
+                    cell.mark_state_change(now_dt, now_mono)
+                    logger.debug("%s back to production: UNSUSPENDING → EXECUTE", cell_id)
 
     def _get_sub_state_for_type(self, cell_type: str) -> MachineSubState:
         """Get the appropriate sub-state for a cell type."""
-        mapping = {
-            "laser_cutter": MachineSubState.CUTTING,
-            "press_brake": MachineSubState.BENDING,
-            "robot_weld": MachineSubState.WELDING,
-            "paint_booth": MachineSubState.PAINTING,
-        }
-        return mapping.get(cell_type, MachineSubState.NONE)
+        return self._SUB_STATE_BY_TYPE.get(cell_type, MachineSubState.NONE)
 
     def _update_jobs(self) -> None:
         """Update job states."""
-        for job in list(self._jobs.values()):
-            if job.status == JobStatus.CREATED:
-                job.status = JobStatus.QUEUED
-
-            # Clean up completed/shipped jobs
-            if job.status == JobStatus.SHIPPED:
-                if job.completed_at and (datetime.now() - job.completed_at).seconds > 300:
-                    del self._jobs[job.job_id]
+        if self._created_jobs:
+            for job in self._created_jobs:
+                if job.status == JobStatus.CREATED:
+                    self._queue_job(job)
+            self._created_jobs.clear()
+
+        # Clean up shipped jobs once they have been visible for 5 minutes
+        now = self._now_mono
+        while self._ship_gc_heap and self._ship_gc_heap[0][0] <= now:
+            _, job_id = heapq.heappop(self._ship_gc_heap)
+            self._jobs.pop(job_id, None)
 
     def _update_agv(self) -> None:
         """Update AGV positions using waypoint system."""
@@ -841,11 +998,11 @@ class Simulator:
 
                 dx = target_x - agv_pos.x
                 dy = target_y - agv_pos.y
-                dist = (dx**2 + dy**2) ** 0.5
+                dist = math.hypot(dx, dy)
 
                 # Update heading
                 if dist > 0.1:
-                    agv_pos.heading_deg = (math.atan2(dy, dx) * 180 / math.pi) % 360
+                    agv_pos.heading_deg = math.degrees(math.atan2(dy, dx)) % 360
 
                 # State machine
                 if agv_pos.status == "IDLE":
@@ -856,20 +1013,19 @@ class Simulator:
                         agv_pos.status = "MOVING"
                         agv_pos.current_task = "RETURN_TO_CHARGE"
                     # Random chance to start new task
-                    elif random.random() < 0.05:
+                    elif self._random.random() < 0.05:
                         # Pick random waypoint
-                        new_target = random.choice(["A", "B", "C", "D", "E", "F"])
+                        new_target = self._random.choice(_WAYPOINT_POOL)
                         agv_pos.target_waypoint = new_target
                         agv_pos.path = f"{agv_pos.current_waypoint}→{new_target}"
                         agv_pos.status = "MOVING"
                         agv_pos.current_task = f"TRANSPORT_TO_{new_target}"
-                        agv_pos.payload_kg = random.uniform(20, agv_pos.max_payload_kg * 0.8)
+                        agv_pos.payload_kg = self._random.uniform(20, agv_pos.max_payload_kg * 0.8)
 
                 elif agv_pos.status == "MOVING":
                     if dist > 0.5:
                         # Move towards target
-                        speed = random.gauss(1.5, 0.2)  # 1.5 m/s avg speed
-                        speed = max(0.5, min(2.0, speed))
+                        speed = self._next_agv_speed()  # 1.5 m/s avg speed
                         agv_pos.speed_mps = speed
 
                         step = speed * 0.1  # Tick interval
@@ -899,6 +1055,7 @@ class Simulator:
                             agv_pos.current_task = "CHARGING"
                         elif agv_pos.current_waypoint.startswith("DOCK_"):
                             agv_pos.status = "DOCKED"
+                            self._agv_undock_tick[agv_id] = self._schedule_rare_event(0.03)
                             agv_pos.docking_station = agv_pos.current_waypoint
                             agv_pos.current_task = None
                         elif agv_pos.payload_kg > 0:
@@ -915,15 +1072,17 @@ class Simulator:
                         agv_pos.status = "IDLE"
                         agv_pos.docking_station = None
                         agv_pos.current_task = None
-                        new_target = random.choice(["A", "B", "C", "D", "E"])
+                        new_target = self._random.choice(_WAYPOINT_POOL_NO_F)
                         agv_pos.target_waypoint = new_target
                         agv_pos.path = f"CHARGE_01→{new_target}"
 
                 elif agv_pos.status in ("LOADING", "UNLOADING"):
                     # Simulate loading/unloading for a few ticks
-                    if random.random() < 0.2:  # 20% chance to finish per tick
+                    if self._random.random() < 0.2:  # 20% chance to finish per tick
                         if agv_pos.status == "LOADING":
-                            agv_pos.payload_kg = random.uniform(20, agv_pos.max_payload_kg * 0.8)
+                            agv_pos.payload_kg = self._random.uniform(
+                                20, agv_pos.max_payload_kg * 0.8
+                            )
                         else:
                             agv_pos.payload_kg = 0
 
@@ -932,76 +1091,86 @@ class Simulator:
                         agv_pos.current_task = None
 
                 elif agv_pos.status == "DOCKED":
-                    # Idle at dock - random chance to start new task
-                    if random.random() < 0.03:
-                        new_target = random.choice(["A", "B", "C", "D", "E", "F"])
+                    # Idle at dock - leaves on its scheduled tick (3% per tick on average)
+                    if self._tick_count >= self._agv_undock_tick.get(agv_id, 0):
+                        new_target = self._random.choice(_WAYPOINT_POOL)
                         agv_pos.target_waypoint = new_target
                         agv_pos.path = f"{agv_pos.current_waypoint}→{new_target}"
                         agv_pos.status = "MOVING"
                         agv_pos.current_task = f"TRANSPORT_TO_{new_target}"
                         agv_pos.docking_station = None
 
+    def _queue_job(self, job: Job) -> None:
+        """Mark a job QUEUED and index it under the cell of its current operation."""
+        job.status = JobStatus.QUEUED
+        if job.current_operation_idx < len(job.routing):
+            self._queued_by_cell[job.routing[job.current_operation_idx]].append(job)
+
     def _get_next_job_for_cell(self, cell_id: str) -> Optional[Job]:
         """Get the next queued job for a cell."""
-        for job in self._jobs.values():
-            if job.status == JobStatus.QUEUED:
-                if job.current_operation_idx < len(job.routing):
-                    if job.routing[job.current_operation_idx] == cell_id:
-                        job.status = JobStatus.IN_PROGRESS
-                        job.current_cell = cell_id
-                        if not job.started_at:
-                            job.started_at = datetime.now()
-
-                        # Create Digital Product Passport when job starts (Level 4)
-                        # Create DPP if this is the first operation AND we don't have one yet
-                        if job.current_operation_idx == 0 and job.job_id not in self._digital_passports:
-                            self._create_dpp_for_job(job)
-                        return job
+        queue = self._queued_by_cell.get(cell_id)
+        while queue:
+            job = queue.popleft()
+            # Skip entries whose job has since moved on (status changed elsewhere)
+            if job.status != JobStatus.QUEUED:
+                continue
+            if job.current_operation_idx >= len(job.routing):
+                continue
+            if job.routing[job.current_operation_idx] != cell_id:
+                continue
+
+            job.status = JobStatus.IN_PROGRESS
+            job.current_cell = cell_id
+            if not job.started_at:
+                job.started_at = self._now_dt
+
+            # Create Digital Product Passport when job starts (Level 4)
+            # Create DPP if this is the first operation AND we don't have one yet
+            if job.current_operation_idx == 0 and job.job_id not in self._digital_passports:
+                self._create_dpp_for_job(job)
+            return job
         return None
 
     def _advance_job(self, job: Job) -> None:
         """Advance a job to its next operation."""
         # Record operation completion for DPP (before advancing)
-        if job.current_cell:
+        if self._dpp_enabled and job.current_cell:
             cell = self._cells.get(job.current_cell)
             if cell:
-                operation_duration = (datetime.now() - cell.state_since).seconds / 60.0
-                self._record_operation_complete(
-                    job=job,
-                    cell_id=job.current_cell,
-                    cell_type=cell.config.cell_type,
-                    operator_id=cell.operator_id or "OP_UNKNOWN",
-                    duration_minutes=operation_duration,
-                    parts_produced=cell.parts_produced,
-                    parts_scrap=cell.parts_scrap,
-                )
+                minutes = cell.seconds_in_state(self._now_mono) / 60.0
+                self._record_operation_complete(job, cell, minutes)
 
         job.current_operation_idx += 1
         if job.current_operation_idx >= len(job.routing):
             job.status = JobStatus.COMPLETED
-            job.completed_at = datetime.now()
+            job.completed_at = self._now_dt
             job.current_cell = None
             # Finalize DPP
             self._finalize_dpp(job)
             # Auto-ship after completion
             job.status = JobStatus.SHIPPED
+            heapq.heappush(self._ship_gc_heap, (self._now_mono + 300, job.job_id))
         else:
-            job.status = JobStatus.QUEUED
             job.current_cell = None
+            self._queue_job(job)
+
+    def _add_job(self, job: Job) -> None:
+        """Register a newly generated job so the next tick releases it to the queue."""
+        self._jobs[job.job_id] = job
+        self._created_jobs.append(job)
 
     def _generate_initial_jobs(self) -> None:
         """Generate initial set of jobs."""
         for _ in range(5):
-            job = self._job_generator.generate_job()
-            self._jobs[job.job_id] = job
+            self._add_job(self._job_generator.generate_job())
         logger.info(f"Generated {len(self._jobs)} initial jobs")
 
-    def _generate_new_job(self) -> None:
-        """Generate a new job."""
-        if len(self._jobs) < 20:  # Cap at 20 active jobs
+    def _generate_new_job(self, count: int = 1) -> None:
+        """Generate up to count new jobs, stopping at the active job cap."""
+        for _ in range(min(count, 20 - len(self._jobs))):  # Cap at 20 active jobs
             job = self._job_generator.generate_job()
-            self._jobs[job.job_id] = job
-            logger.debug(f"Generated new job: {job.job_id}")
+            self._add_job(job)
+            logger.debug("Generated new job: %s", job.job_id)
 
     # =========================================================================
     # New publishing methods for enhanced data
@@ -1014,7 +1183,7 @@ class Simulator:
             reading = self._solar_gen.generate_power_reading(array)
             topic = f"_raw/solar/{array.array_id}"
             self._mqtt.publish(
-                topic, reading, retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS
+                topic, reading, retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS, qos=0
             )
 
         # Facility-wide solar summary - no retention for energy metrics
@@ -1032,49 +1201,56 @@ class Simulator:
             if not cell:
                 continue
 
-            # Publish to the standard _state topic for the AGV cell
-            topic = f"{cell.config.area_id}/{agv_id}/_state"
-            self._mqtt.publish(
-                topic, agv_pos.to_state_dict(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
-            )
-
-            # Also publish to aggregated topic for fleet view
-            fleet_topic = f"_state/agv_fleet/{agv_id}"
-            self._mqtt.publish(
-                fleet_topic, agv_pos.to_state_dict(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
+            # Standard _state topic for the AGV cell plus the aggregated fleet view,
+            # sharing one payload so it is built and serialized once
+            payload = agv_pos.to_state_dict()
+            self._mqtt.publish_many(
+                [
+                    (f"{cell.config.area_id}/{agv_id}/_state", payload),
+                    (f"_state/agv_fleet/{agv_id}", payload),
+                ],
+                retain=True,
+                required_level=ComplexityLevel.LEVEL_2_STATEFUL,
             )
 
     def _update_operators(self) -> None:
         """Update operator states based on time and simulation."""
-        now = datetime.now()
+        now = self._now_dt
         current_shift = (
             ShiftType.DAY if 6 <= now.hour < 14
             else ShiftType.EVENING if 14 <= now.hour < 22
             else ShiftType.NIGHT
         )
 
+        cell_ids = self._cell_ids
         for op in self._operator_gen.operators.values():
+            status = op.status
+            # Operators outside the shift cycle (sick, vacation, ...) never transition here
+            if status not in self._OPERATOR_ACTIVE_STATUSES:
+                continue
+
             # Clock in operators for current shift
-            if op.shift == current_shift and op.status == OperatorStatus.CLOCKED_OUT:
+            if status == OperatorStatus.CLOCKED_OUT:
+                if op.shift != current_shift:
+                    continue
                 op.status = OperatorStatus.CLOCKED_IN
                 op.clocked_in_at = now
 
             # Randomly put some operators at machines
-            if op.status == OperatorStatus.CLOCKED_IN and random.random() < 0.3:
+            if op.status == OperatorStatus.CLOCKED_IN and self._random.random() < 0.3:
                 op.status = OperatorStatus.AT_MACHINE
                 # Assign to a random cell
-                cell_ids = list(self._cells.keys())
                 if cell_ids:
-                    op.assigned_cell = random.choice(cell_ids)
+                    op.assigned_cell = self._random.choice(cell_ids)
 
             # Random breaks
-            if op.status == OperatorStatus.AT_MACHINE and random.random() < 0.02:
+            if op.status == OperatorStatus.AT_MACHINE and self._random.random() < 0.02:
                 op.status = OperatorStatus.ON_BREAK
                 op.break_start = now
 
             # End breaks
             if op.status == OperatorStatus.ON_BREAK and op.break_start:
-                if (now - op.break_start).seconds > 900:  # 15 min break
+                if (now - op.break_start).total_seconds() > 900:  # 15 min break
                     op.status = OperatorStatus.AT_MACHINE
                     op.break_start = None
 
@@ -1099,26 +1275,27 @@ class Simulator:
 
     def _publish_raw_material_inventory(self) -> None:
         """Publish raw material inventory data (Level 3+)."""
-        # Summary of low-stock items
-        low_stock_items = []
-        for item_num, item in self._inventory_gen.inventory.items():
-            if item.available_quantity < item.minimum_stock:
-                low_stock_items.append({
-                    "item_number": item.item_number,
-                    "description": item.item_description,
-                    "available": item.available_quantity,
-                    "minimum": item.minimum_stock,
-                    "shortfall": item.minimum_stock - item.available_quantity,
-                })
+        inventory = self._inventory_gen
+
+        # Summary of low-stock items (top 5), from the generator's cached aggregates
+        low_stock_items = [
+            {
+                "item_number": item.item_number,
+                "description": item.item_description,
+                "available": item.available_quantity,
+                "minimum": item.minimum_stock,
+                "shortfall": item.minimum_stock - item.available_quantity,
+            }
+            for item in islice(inventory.low_stock.values(), 5)
+        ]
 
         # Inventory summary
-        total_value = sum(i.available_quantity * i.unit_cost_eur for i in self._inventory_gen.inventory.values())
         summary = {
-            "total_sku_count": len(self._inventory_gen.inventory),
-            "total_value_eur": round(total_value, 2),
-            "low_stock_count": len(low_stock_items),
-            "low_stock_items": low_stock_items[:5],  # Top 5 low stock
-            "timestamp_ms": int(time.time() * 1000),
+            "total_sku_count": len(inventory.inventory),
+            "total_value_eur": round(inventory.total_value_eur, 2),
+            "low_stock_count": len(inventory.low_stock),
+            "low_stock_items": low_stock_items,
+            "timestamp_ms": self._now_ms,
         }
 
         topic = "_erp/inventory/raw_materials"
@@ -1128,22 +1305,23 @@ class Simulator:
         )
 
         # Publish a few individual inventory items - retain for reference
-        for item_num, item in list(self._inventory_gen.inventory.items())[:10]:
+        for item_num, item in islice(inventory.inventory.items(), 10):
             topic = f"_erp/inventory/{item_num}"
-            self._mqtt.publish(
-                topic, item.to_erp_dict(), retain=True, required_level=ComplexityLevel.LEVEL_3_ERP_MES
+            self._mqtt.publish_bytes(
+                topic, item.to_erp_json(self._now_dt), retain=True, required_level=ComplexityLevel.LEVEL_3_ERP_MES
             )
 
     def _check_shift_change(self) -> None:
         """Check for shift changes and publish events."""
-        now = datetime.now()
-        current_hour = now.hour
-
-        # Check every hour
-        if time.time() - self._shift_check_time < 3600:
+        # Only look at the clock once per hour, right after the hour boundary
+        now_mono = self._now_mono
+        if now_mono < self._next_shift_check_mono:
             return
 
-        self._shift_check_time = time.time()
+        now = self._now_dt
+        current_hour = now.hour
+        seconds_into_hour = now.minute * 60 + now.second + now.microsecond / 1_000_000
+        self._next_shift_check_mono = now_mono + (3600 - seconds_into_hour)
 
         # Shift change hours
         if current_hour in (6, 14, 22):
@@ -1159,7 +1337,7 @@ class Simulator:
                 "event_type": "SHIFT_CHANGE",
                 "new_shift": new_shift.value,
                 "message": f"Shift change to {new_shift.value} shift",
-                "timestamp_ms": int(time.time() * 1000),
+                "timestamp_ms": self._now_ms,
             }
             self._mqtt.publish(
                 topic, payload, retain=False, required_level=ComplexityLevel.LEVEL_4_FULL
@@ -1182,8 +1360,7 @@ class Simulator:
 
     def _create_dpps_for_active_jobs(self) -> None:
         """Create DPPs for all jobs currently in progress (when switching to Level 4)."""
-        features = get_features_for_level(self._level)
-        if not features.dpp:
+        if not self._dpp_enabled:
             return
 
         created_count = 0
@@ -1197,8 +1374,7 @@ class Simulator:
 
     def _create_dpp_for_job(self, job: Job) -> None:
         """Create a Digital Product Passport when a job starts."""
-        features = get_features_for_level(self._level)
-        if not features.dpp:
+        if not self._dpp_enabled:
             return
 
         # Extract material info from job
@@ -1208,9 +1384,9 @@ class Simulator:
         # Create DPP
         dpp = self._dpp_generator.create_dpp_for_job(
             job_id=job.job_id,
-            work_order=f"WO-2025-{random.randint(1000, 9999)}",
+            work_order=f"WO-2025-{self._random.randint(1000, 9999)}",
             product_name=job.job_name,
-            customer=job.customer_name,
+            customer=job.customer,
             material_code=material_code,
             thickness_mm=thickness,
             quantity=job.qty_target,
@@ -1228,30 +1404,28 @@ class Simulator:
 
         logger.info(f"Created DPP {dpp.dpp_id} for job {job.job_id}")
 
-    def _record_operation_complete(self, job: Job, cell_id: str, cell_type: str,
-                                   operator_id: str, duration_minutes: float,
-                                   parts_produced: int, parts_scrap: int) -> None:
-        """Record an operation completion in the DPP."""
-        features = get_features_for_level(self._level)
-        if not features.dpp or job.job_id not in self._digital_passports:
+    def _record_operation_complete(self, job: Job, cell: CellState,
+                                   duration_minutes: float) -> None:
+        """Record an operation completion on ``cell`` in the job's DPP."""
+        if not self._dpp_enabled:
             return
-
-        dpp = self._digital_passports[job.job_id]
-
-        # Get cell to estimate energy consumption
-        cell = self._cells.get(cell_id)
-        if not cell:
+        dpp = self._digital_passports.get(job.job_id)
+        if dpp is None:
             return
 
+        cell_id = cell.config.id
+        cell_type = cell.config.cell_type
+        operator_id = cell.operator_id or "OP_UNKNOWN"
+
         # Estimate energy based on machine type and duration
-        energy_kwh = self._estimate_operation_energy(cell_type, duration_minutes)
+        energy_kwh = self._estimate_operation_energy(cell, duration_minutes)
 
         # Map cell type to operation type
         operation_type = self._map_cell_to_operation(cell_type)
 
         # Get operator name
         operator = self._operator_gen.operators.get(operator_id)
-        operator_name = operator.name if operator else operator_id
+        operator_name = f"{operator.first_name} {operator.last_name}" if operator else operator_id
 
         # Create operation record
         operation = self._dpp_generator.create_operation_record(
@@ -1262,15 +1436,15 @@ class Simulator:
             operator_name=operator_name,
             duration_minutes=duration_minutes,
             energy_kwh=energy_kwh,
-            parts_produced=parts_produced,
-            parts_scrap=parts_scrap,
+            parts_produced=cell.parts_produced,
+            parts_scrap=cell.parts_scrap,
         )
 
         dpp.add_operation(operation)
 
         # Randomly add quality check (30% chance)
-        if random.random() < 0.3:
-            check_type = random.choice(["DIMENSIONAL", "VISUAL", "FUNCTIONAL"])
+        if self._random.random() < 0.3:
+            check_type = self._random.choice(["DIMENSIONAL", "VISUAL", "FUNCTIONAL"])
             quality_check = self._dpp_generator.create_quality_check(check_type)
             dpp.add_quality_check(quality_check)
 
@@ -1292,16 +1466,15 @@ class Simulator:
 
     def _finalize_dpp(self, job: Job) -> None:
         """Finalize DPP when job is complete."""
-        features = get_features_for_level(self._level)
-        if not features.dpp or job.job_id not in self._digital_passports:
+        if not self._dpp_enabled or job.job_id not in self._digital_passports:
             return
 
         dpp = self._digital_passports[job.job_id]
         dpp.finalize()
 
         # Simulate shipping
-        transport_km = random.uniform(50, 500)  # 50-500 km
-        transport_mode = random.choice(["TRUCK", "TRUCK", "RAIL"])  # Trucks more common
+        transport_km = self._random.uniform(50, 500)  # 50-500 km
+        transport_mode = self._random.choice(["TRUCK", "TRUCK", "RAIL"])  # Trucks more common
         dpp.ship(transport_km, transport_mode)
 
         # Publish finalized event
@@ -1316,73 +1489,30 @@ class Simulator:
 
         logger.info(f"Finalized DPP {dpp.dpp_id} - Total CO2: {dpp.carbon_footprint.total_co2_kg:.4f} kg")
 
-    def _estimate_operation_energy(self, cell_type: str, duration_minutes: float) -> float:
-        """Estimate energy consumption for an operation."""
-        # Average power consumption by machine type (kW)
-        power_ratings = {
-            "laser_cutter": 25.0,
-            "press_brake": 15.0,
-            "robot_weld": 8.0,
-            "powder_coating_line": 45.0,
-            "assembly": 2.0,
-            "agv": 1.5,
-        }
-
-        power_kw = power_ratings.get(cell_type, 10.0)
-        energy_kwh = (power_kw * duration_minutes) / 60.0
-        return energy_kwh
+    def _estimate_operation_energy(self, cell: CellState, duration_minutes: float) -> float:
+        """Estimate energy consumption for an operation on a cell."""
+        return cell.operation_power_kw * duration_minutes / 60.0
 
     def _map_cell_to_operation(self, cell_type: str) -> str:
         """Map cell type to DPP operation type."""
-        mapping = {
-            "laser_cutter": "LASER_CUTTING",
-            "press_brake": "PRESS_FORMING",
-            "robot_weld": "ROBOTIC_WELDING",
-            "powder_coating_line": "POWDER_COATING",
-            "assembly": "ASSEMBLY",
-        }
-        return mapping.get(cell_type, "PROCESSING")
+        return self._CELL_TO_OP_TYPE.get(cell_type, "PROCESSING")
 
     def _publish_dpp(self, dpp: DigitalProductPassport) -> None:
         """Publish DPP data to MQTT."""
         base = f"_dpp/passports/{dpp.dpp_id}"
 
-        # Metadata (retained)
-        self._mqtt.publish(
-            f"{base}/metadata",
-            dpp.to_metadata_dict(),
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_4_FULL,
-        )
-
-        # Carbon footprint (retained)
-        self._mqtt.publish(
-            f"{base}/carbon_footprint",
-            {**dpp.carbon_footprint.to_dict(), "material": dpp.material.to_dict()},
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_4_FULL,
-        )
-
-        # Traceability (retained)
-        self._mqtt.publish(
-            f"{base}/traceability",
-            dpp.to_traceability_dict(),
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_4_FULL,
-        )
-
-        # Certifications (retained)
-        self._mqtt.publish(
-            f"{base}/certifications",
-            dpp.to_certifications_dict(),
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_4_FULL,
-        )
-
-        # Summary (retained)
-        self._mqtt.publish(
-            f"{base}/summary",
-            dpp.to_summary_dict(),
+        # Metadata, carbon footprint, traceability, certifications and summary (all retained)
+        self._mqtt.publish_many(
+            [
+                (f"{base}/metadata", dpp.to_metadata_dict()),
+                (
+                    f"{base}/carbon_footprint",
+                    {**dpp.carbon_footprint.to_dict(), "material": dpp.material.to_dict()},
+                ),
+                (f"{base}/traceability", dpp.to_traceability_dict()),
+                (f"{base}/certifications", dpp.to_certifications_dict()),
+                (f"{base}/summary", dpp.to_summary_dict()),
+            ],
             retain=True,
             required_level=ComplexityLevel.LEVEL_4_FULL,
         )
@@ -1390,6 +1520,7 @@ class Simulator:
     def _publish_dpp_event(self, dpp: DigitalProductPassport, event_type: DPPEventType,
                           extra_data: Optional[Dict[str, Any]] = None) -> None:
         """Publish a DPP event notification (non-retained, for external subscribers)."""
+        now_dt = self._now_dt
         event_data = {
             "event_type": event_type.value,
             "dpp_id": dpp.dpp_id,
@@ -1397,27 +1528,22 @@ class Simulator:
             "product_name": dpp.product_name,
             "customer": dpp.customer,
             "status": dpp.status.value,
-            "timestamp": datetime.now().isoformat() + "Z",
-            "timestamp_ms": int(time.time() * 1000),
+            "timestamp": now_dt.isoformat() + "Z",
+            "timestamp_ms": self._now_ms,
         }
 
         if extra_data:
             event_data.update(extra_data)
 
-        # Publish to general events topic (external systems subscribe here)
-        self._mqtt.publish(
-            "_dpp/events",
-            event_data,
-            retain=False,  # Events are streaming, not retained
-            required_level=ComplexityLevel.LEVEL_4_FULL,
-        )
-
-        # Also publish to event-specific topic
+        # Publish to the general events topic (external systems subscribe here)
+        # and the event-specific topic; the shared payload is serialized once
         event_name = event_type.value.lower()
-        self._mqtt.publish(
-            f"_dpp/events/{event_name}/{dpp.dpp_id}",
-            event_data,
-            retain=False,
+        self._mqtt.publish_many(
+            [
+                ("_dpp/events", event_data),
+                (f"_dpp/events/{event_name}/{dpp.dpp_id}", event_data),
+            ],
+            retain=False,  # Events are streaming, not retained
             required_level=ComplexityLevel.LEVEL_4_FULL,
         )
 
@@ -1431,138 +1557,100 @@ class Simulator:
 
         # Handle completed traversals (parts done coating)
         for trav in completed:
-            logger.debug(f"Traversal {trav.traversal_id} completed coating")
+            logger.debug("Traversal %s completed coating", trav.traversal_id)
 
         # Random color change (roughly every 2-4 hours in real time)
-        if random.random() < 0.001:
-            new_color = random.choice(RAL_COLORS)
+        if self._tick_count >= self._next_color_change_tick:
+            self._next_color_change_tick = self._schedule_rare_event(0.001)
+            new_color = self._random.choice(RAL_COLORS)
             self._powder_coating_line.change_color(new_color[0], new_color[1], new_color[2])
             logger.info(f"Color change to {new_color[0]} ({new_color[1]})")
 
     def _publish_powder_coating_state(self) -> None:
         """Publish powder coating line state data (Level 2+)."""
+        if not self._emit_l2:
+            return
         line = self._powder_coating_line
 
-        # Zone summary - overall line state
-        topic = f"finishing/coating_line_01/_state/summary"
-        self._mqtt.publish(
-            topic, line.get_zone_summary(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
+        # Payloads are built lazily, only once the batch passes the level gate
+        def state_messages():
+            # Zone summary - overall line state
+            yield line.topics["summary"], line.get_zone_summary()
+            now = self._now_dt
+            # Booth and oven states; the client skips retained bytes it already sent
+            for topic, zone in line.zone_state_sources:
+                yield topic, zone.to_state_json(now)
+            # Individual traversal states (active work in progress)
+            for trav in line.traversals.values():
+                yield trav.state_topic, trav.to_state_dict(now)
+
+        # States are retained; sensor data is non-retained historian data
+        self._mqtt.publish_many(
+            state_messages(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
         )
-
-        # Coating booth state (retained)
-        topic = f"finishing/coating_line_01/_state/booth"
-        self._mqtt.publish(
-            topic, line.coating_booth.to_state_dict(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
-        )
-
-        # Booth sensor data (non-retained historian)
-        topic = f"finishing/coating_line_01/_raw/booth"
-        self._mqtt.publish(
-            topic, line.coating_booth.to_sensor_dict(), retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS
-        )
-
-        # Drying oven state
-        topic = f"finishing/coating_line_01/_state/drying_oven"
-        self._mqtt.publish(
-            topic, line.drying_oven.to_state_dict(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
-        )
-
-        # Drying oven sensor data
-        topic = f"finishing/coating_line_01/_raw/drying_oven"
-        self._mqtt.publish(
-            topic, line.drying_oven.to_sensor_dict(), retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS
-        )
-
-        # Curing oven state
-        topic = f"finishing/coating_line_01/_state/curing_oven"
-        self._mqtt.publish(
-            topic, line.curing_oven.to_state_dict(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
-        )
-
-        # Curing oven sensor data
-        topic = f"finishing/coating_line_01/_raw/curing_oven"
-        self._mqtt.publish(
-            topic, line.curing_oven.to_sensor_dict(), retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS
-        )
-
-        # Individual traversal states (active work in progress)
-        for trav_id, trav in line.traversals.items():
-            topic = f"finishing/coating_line_01/_state/traversals/{trav_id}"
-            self._mqtt.publish(
-                topic, trav.to_state_dict(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
+        if self._emit_l1:
+            self._mqtt.publish_many(
+                ((topic, zone.to_sensor_dict()) for topic, zone in line.zone_raw_sources),
+                retain=False,
+                required_level=ComplexityLevel.LEVEL_1_SENSORS,
+                qos=0,
             )
 
     def _publish_powder_coating_metadata(self) -> None:
         """Publish powder coating line metadata (Level 2+)."""
-        # Main metadata
-        topic = f"finishing/coating_line_01/_meta/line"
-        self._mqtt.publish(
-            topic,
-            self._powder_coating_line.to_meta_dict(),
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_2_STATEFUL,
-        )
+        if not self._emit_l2:
+            return
+        line = self._powder_coating_line
 
-        # Shared resource metadata (enterprise-level topic)
-        shared_topic = "_meta/shared_resources/powder_coating"
-        self._mqtt.publish(
-            shared_topic,
-            {
+        def meta_messages():
+            # Main metadata
+            yield line.topics["meta"], line.to_meta_dict()
+            # Shared resource metadata (enterprise-level topic)
+            yield "_meta/shared_resources/powder_coating", {
                 "resource_type": "POWDER_COATING_LINE",
-                "line_id": self._powder_coating_line.line_id,
-                "location_facility": self._powder_coating_line.location,
+                "line_id": line.line_id,
+                "location_facility": line.location,
                 "location_area": "finishing",
                 "shared_resource": True,
-                "serves_facilities": list(self._powder_coating_line.facilities.keys()),
+                "serves_facilities": list(line.facilities.keys()),
                 "capacity_parts_per_day": 500,
-                "available_colors": [{"ral_code": r[0], "ral_name": r[1], "hex": r[2]} for r in RAL_COLORS],
-            },
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_2_STATEFUL,
+                "available_colors": RAL_COLOR_DICTS,
+            }
+
+        self._mqtt.publish_many(
+            meta_messages(), retain=True, required_level=ComplexityLevel.LEVEL_2_STATEFUL
         )
 
     def _publish_powder_coating_planning(self) -> None:
         """Publish MES planning data for shared powder coating resource (Level 3+)."""
+        if not self._emit_l3:
+            return
         line = self._powder_coating_line
 
-        # Planning summary (shows orders from all facilities)
-        topic = "finishing/coating_line_01/_mes/planning/summary"
-        self._mqtt.publish(
-            topic,
-            line.get_planning_summary(),
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_3_ERP_MES,
-        )
-
-        # Detailed order queue
-        topic = "finishing/coating_line_01/_mes/planning/queue"
-        self._mqtt.publish(
-            topic,
-            {"orders": line.get_order_queue(max_orders=15)},
-            retain=False,  # Queue changes frequently
-            required_level=ComplexityLevel.LEVEL_3_ERP_MES,
-        )
-
-        # Per-facility views
-        for facility in line.facilities.keys():
-            topic = f"finishing/coating_line_01/_mes/planning/facility/{facility}"
-            self._mqtt.publish(
-                topic,
-                line.get_facility_orders(facility),
-                retain=False,
-                required_level=ComplexityLevel.LEVEL_3_ERP_MES,
-            )
-
-        # Enterprise-level shared resource planning view
-        enterprise_topic = "_mes/shared_resources/powder_coating/planning"
-        self._mqtt.publish(
-            enterprise_topic,
-            {
+        def retained_messages():
+            # Planning summary (shows orders from all facilities)
+            summary = line.get_planning_summary()
+            yield line.topics["planning_summary"], summary
+            # Enterprise-level shared resource planning view
+            yield "_mes/shared_resources/powder_coating/planning", {
                 "resource_id": line.line_id,
                 "location": line.location,
-                "summary": line.get_planning_summary(),
-                "next_available_slot": (datetime.now() + timedelta(minutes=45)).isoformat() + "Z",
-            },
-            retain=True,
-            required_level=ComplexityLevel.LEVEL_3_ERP_MES,
+                "summary": summary,
+                "next_available_slot": (self._now_dt + timedelta(minutes=45)).isoformat() + "Z",
+            }
+
+        def queue_messages():
+            # Detailed order queue (changes frequently, not retained)
+            yield line.topics["planning_queue"], {
+                "orders": line.get_order_queue(max_orders=15)
+            }
+            # Per-facility views
+            for facility, topic in line.facility_topics.items():
+                yield topic, line.get_facility_orders(facility)
+
+        self._mqtt.publish_many(
+            retained_messages(), retain=True, required_level=ComplexityLevel.LEVEL_3_ERP_MES
+        )
+        self._mqtt.publish_many(
+            queue_messages(), retain=False, required_level=ComplexityLevel.LEVEL_3_ERP_MES
         )
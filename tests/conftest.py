@@ -0,0 +1,87 @@
+"""Shared test fixtures."""
+
+import random
+from typing import Any, List, Tuple
+
+import pytest
+
+from metalfab_uns_sim.complexity import ComplexityLevel
+from metalfab_uns_sim.config import Config
+from metalfab_uns_sim.simulator import Simulator
+
+
+@pytest.fixture(scope="session")
+def default_config():
+    """Default simulator config, built once for the whole session.
+
+    Simulator only stamps each cell config's area_id, which is idempotent,
+    so the config can be shared. Simulators themselves stay per-test and
+    are seeded from it, so their draws repeat from run to run.
+    """
+    config = Config.default()
+    config.simulation.random_seed = 0
+    return config
+
+
+@pytest.fixture(autouse=True)
+def _seed_random():
+    """Reseed the global RNG so each test sees the same draws in any order."""
+    random.seed(0)
+
+
+class FakeMQTT:
+    """Lightweight MQTT double recording what the simulator publishes.
+
+    publishes holds (topic, required_level) for every message; batches holds
+    the (topic, payload) list of each publish_many call.
+    """
+
+    def __init__(self):
+        self.connected = True
+        self.base_topic = "umh/v1/test/site"
+        self.levels_set: List[ComplexityLevel] = []
+        self.publishes: List[Tuple[str, ComplexityLevel]] = []
+        self.batches: List[List[Tuple[str, Any]]] = []
+
+    def connect(self, dry_run=False):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def set_level(self, level):
+        self.levels_set.append(level)
+
+    def publish_simulator_status(self, level, sites_enabled):
+        pass
+
+    def publish(self, topic, payload, retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS, qos=None):
+        self.publishes.append((topic, required_level))
+        return True
+
+    def publish_bytes(self, topic, payload, retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS):
+        self.publishes.append((topic, required_level))
+        return True
+
+    def publish_many(self, messages, retain=False, required_level=ComplexityLevel.LEVEL_1_SENSORS, qos=None):
+        batch = list(messages)
+        self.batches.append(batch)
+        self.publishes.extend((topic, required_level) for topic, _ in batch)
+        return True
+
+
+@pytest.fixture
+def mock_mqtt():
+    return FakeMQTT()
+
+
+@pytest.fixture
+def simulator(default_config, mock_mqtt):
+    """Simulator on the default config, publishing to mock_mqtt."""
+    return Simulator(default_config, mqtt_client=mock_mqtt)
+
+
+@pytest.fixture(scope="class")
+def shared_simulator(default_config):
+    """Simulator built once per test class, for tests that only read it."""
+    return Simulator(default_config)
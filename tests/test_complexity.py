@@ -1,6 +1,7 @@
 """Tests for complexity levels."""
 
 import pytest
+from dataclasses import FrozenInstanceError
 from metalfab_uns_sim.complexity import (
     ComplexityLevel,
     get_features_for_level,
@@ -83,6 +84,13 @@ class TestGetFeaturesForLevel:
         assert features.events_alarms is True
         assert features.dashboards is True
 
+    def test_features_cached_and_frozen(self):
+        features = get_features_for_level(ComplexityLevel.LEVEL_2_STATEFUL)
+
+        assert get_features_for_level(ComplexityLevel.LEVEL_2_STATEFUL) is features
+        with pytest.raises(FrozenInstanceError):
+            features.sensors = False
+
 
 class TestGetNamespacesForLevel:
     """Tests for get_namespaces_for_level."""
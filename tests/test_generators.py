@@ -1,13 +1,22 @@
 """Tests for data generators."""
 
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
 import pytest
 from metalfab_uns_sim.generators import (
     ERPMESGenerator,
+    InventoryGenerator,
+    InventoryItem,
     Job,
     JobGenerator,
     JobPriority,
     JobStatus,
     PackMLState,
+    PowderCoatingLine,
+    PowderCoatingZone,
+    SensorBatchGenerator,
     SensorGenerator,
     create_sensor_generators,
 )
@@ -55,6 +64,56 @@ class TestSensorGenerator:
         assert reading["quality"] == "GOOD"
 
 
+class TestSensorBatchGenerator:
+    """Tests for SensorBatchGenerator."""
+
+    @pytest.fixture
+    def batch(self):
+        return SensorBatchGenerator(
+            [
+                SensorGenerator("a", base_value=50.0, min_value=0.0, max_value=100.0, noise_stddev=0.0),
+                SensorGenerator("b", base_value=20.0, min_value=5.0, max_value=30.0, noise_stddev=0.0),
+            ]
+        )
+
+    def test_state_codes_match_single_sensor_rules(self, batch):
+        codes = np.array([SensorBatchGenerator.STATE_EXECUTE, SensorBatchGenerator.STATE_OFF])
+        assert batch.generate_all(codes).tolist() == [50.0, 5.0]
+
+        codes = np.full(2, SensorBatchGenerator.state_code(PackMLState.STARTING))
+        assert batch.generate_all(codes).tolist() == [25.0, 10.0]
+
+    def test_reads_current_generator_parameters(self, batch):
+        batch.generators[0].base_value = 60.0
+        codes = np.full(2, SensorBatchGenerator.STATE_EXECUTE)
+
+        assert batch.generate_all(codes).tolist() == [60.0, 20.0]
+
+    def test_drift_advances_on_the_generator(self):
+        gen = SensorGenerator(
+            "a", base_value=50.0, max_value=100.0, noise_stddev=0.0, drift_rate=1.0
+        )
+        batch = SensorBatchGenerator([gen])
+        codes = np.full(1, SensorBatchGenerator.STATE_EXECUTE)
+
+        assert batch.generate_all(codes, now=gen._last_update + 3600).tolist() == [51.0]
+        assert gen._current_drift == 1.0
+
+    def test_indices_select_sensors(self, batch):
+        codes = np.full(1, SensorBatchGenerator.STATE_EXECUTE)
+
+        assert batch.generate_all(codes, indices=[1]).tolist() == [20.0]
+
+    def test_values_clipped_to_range(self):
+        batch = SensorBatchGenerator(
+            [SensorGenerator("a", base_value=50.0, max_value=100.0, noise_stddev=500.0)]
+        )
+        codes = np.full(1, SensorBatchGenerator.STATE_EXECUTE)
+
+        for _ in range(50):
+            assert 0.0 <= batch.generate_all(codes)[0] <= 100.0
+
+
 class TestCreateSensorGenerators:
     """Tests for sensor generator factory."""
 
@@ -151,6 +210,69 @@ class TestJobGenerator:
         assert id2 == id1 + 1
 
 
+class TestCachedPayload:
+    """Tests for cached retained payload serialization."""
+
+    @pytest.fixture
+    def item(self):
+        return InventoryItem(item_number="SHT-001", item_description="Sheet", available_quantity=10)
+
+    def test_erp_json_stamped_with_given_time(self, item):
+        now = datetime(2030, 1, 1, 6, 0)
+
+        payload = json.loads(item.to_erp_json(now))
+
+        assert payload == {**item.to_erp_dict(), "_updated_at": now.isoformat() + "Z"}
+
+    def test_cached_body_reused_until_invalidated(self, item):
+        item.to_erp_json()
+
+        item.available_quantity = 5
+        assert json.loads(item.to_erp_json())["available_quantity"] == 10
+
+        item._invalidate_payload()
+        assert json.loads(item.to_erp_json())["available_quantity"] == 5
+
+    def test_inventory_adjust_invalidates_item(self):
+        gen = InventoryGenerator()
+        item_number, item = next(iter(gen.inventory.items()))
+        before = json.loads(item.to_erp_json())["available_quantity"]
+
+        gen.adjust(item_number, -1)
+
+        assert json.loads(item.to_erp_json())["available_quantity"] == before - 1
+
+
+class TestInventoryGenerator:
+    """Tests for InventoryGenerator."""
+
+    def test_initial_aggregates_match_inventory(self):
+        gen = InventoryGenerator()
+
+        expected_value = sum(
+            i.available_quantity * i.unit_cost_eur for i in gen.inventory.values()
+        )
+        assert gen.total_value_eur == pytest.approx(expected_value)
+        assert set(gen.low_stock) == {
+            num for num, i in gen.inventory.items() if i.available_quantity < i.minimum_stock
+        }
+
+    def test_adjust_updates_aggregates(self):
+        gen = InventoryGenerator()
+        item_num, item = next(iter(gen.inventory.items()))
+        value_before = gen.total_value_eur
+
+        delta = item.minimum_stock - item.available_quantity - 1
+        gen.adjust(item_num, delta)
+
+        assert item.available_quantity == item.minimum_stock - 1
+        assert gen.total_value_eur == pytest.approx(value_before + delta * item.unit_cost_eur)
+        assert item_num in gen.low_stock
+
+        gen.adjust(item_num, 10)
+        assert item_num not in gen.low_stock
+
+
 class TestERPMESGenerator:
     """Tests for ERPMESGenerator."""
 
@@ -208,3 +330,62 @@ class TestERPMESGenerator:
         assert metrics["machines_running"] == 2
         assert metrics["machines_total"] == 3
         assert metrics["fleet_utilization_pct"] == pytest.approx(66.7, rel=0.1)
+
+
+class TestPowderCoatingLine:
+    """Tests for PowderCoatingLine."""
+
+    def test_topics_are_precomputed(self):
+        line = PowderCoatingLine()
+
+        assert line.topics["summary"] == "finishing/coating_line_01/_state/summary"
+        assert line.topics["curing_raw"] == "finishing/coating_line_01/_raw/curing_oven"
+        assert line.facility_topics["brasov"] == (
+            "finishing/coating_line_01/_mes/planning/facility/brasov"
+        )
+
+    def test_new_traversal_gets_state_topic(self):
+        line = PowderCoatingLine()
+
+        trav = line._add_traversal(PowderCoatingZone.LOADING)
+
+        assert trav.state_topic == (
+            f"finishing/coating_line_01/_state/traversals/{trav.traversal_id}"
+        )
+
+    def test_tick_invalidates_oven_state_on_count_change(self):
+        line = PowderCoatingLine()
+        oven = line.curing_oven
+        oven.to_state_json()
+        # Stale count, so the next tick must correct it and re-encode the state
+        oven.traversals_inside = -1
+
+        line.tick()
+
+        inside = line.count_in_zone(PowderCoatingZone.CURING_OVEN)
+        assert json.loads(oven.to_state_json())["traversals_inside"] == inside
+
+    def test_zone_state_json_stamped_with_given_clock(self):
+        line = PowderCoatingLine()
+        booth = line.coating_booth
+        first = booth.last_color_change + timedelta(minutes=5)
+        later = first + timedelta(seconds=1)
+
+        booth.to_state_json(first)
+        booth_state = json.loads(booth.to_state_json(later))
+        oven_state = json.loads(line.curing_oven.to_state_json(later))
+
+        assert booth_state["_updated_at"] == later.isoformat() + "Z"
+        assert booth_state["time_since_color_change"] == "5m"
+        assert oven_state["_updated_at"] == later.isoformat() + "Z"
+
+    def test_traversal_state_dict_uses_given_clock(self):
+        line = PowderCoatingLine()
+        trav = line._add_traversal(PowderCoatingZone.LOADING)
+        now = trav.zone_entered_at + timedelta(seconds=90)
+
+        state = trav.to_state_dict(now)
+
+        assert state["time_in_zone_seconds"] == 90
+        assert state["time_in_zone"] == "1m 30s"
+        assert state["_updated_at"] == now.isoformat() + "Z"
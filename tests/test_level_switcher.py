@@ -2,84 +2,111 @@
 
 import json
 import pytest
-from unittest.mock import MagicMock, patch, call
+from dataclasses import fields
+from typing import Set
+from unittest.mock import MagicMock
 
 from metalfab_uns_sim.complexity import ComplexityLevel, get_features_for_level
-from metalfab_uns_sim.config import Config, MQTTConfig, UNSConfig
+from metalfab_uns_sim.config import MQTTConfig, UNSConfig
 from metalfab_uns_sim.mqtt_client import MQTTClient
 from metalfab_uns_sim.simulator import Simulator
 
 
+# Level control payloads, serialized once for the parametrized MQTT tests
+LEVEL_PAYLOADS = {
+    level: json.dumps({"level": int(level)}).encode()
+    for level in ComplexityLevel
+    if level != ComplexityLevel.LEVEL_0_PAUSED
+}
+
+
+def _enabled_features(features) -> Set[str]:
+    """Names of the feature flags switched on in a LevelFeatures."""
+    return {f.name for f in fields(features) if getattr(features, f.name)}
+
+
+def _tick_levels(sim, mock_mqtt) -> Set[ComplexityLevel]:
+    """Run one tick and return the required levels of everything it published."""
+    mock_mqtt.publishes.clear()
+    sim._tick()
+    return {level for _, level in mock_mqtt.publishes}
+
+
 class TestLevelSwitcherMQTTClient:
     """Tests for level switching in MQTTClient."""
 
-    @pytest.fixture
-    def mqtt_config(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mqtt_config(cls):
         return MQTTConfig(broker="localhost", port=1883, client_id="test")
 
-    @pytest.fixture
-    def uns_config(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def uns_config(cls):
         return UNSConfig(enterprise="test", site="site1", topic_prefix="umh/v1")
 
-    def test_initial_level_is_level_2(self, mqtt_config, uns_config):
+    @pytest.fixture
+    def make_client(self, mqtt_config, uns_config):
+        """Build a fresh client; paho is only created on connect(), so this is cheap."""
+        def factory(**kwargs):
+            return MQTTClient(mqtt_config, uns_config, **kwargs)
+        return factory
+
+    @pytest.fixture
+    def client(self, make_client):
+        return make_client()
+
+    def test_initial_level_is_level_2(self, client):
         """Default level should be Level 2 (Stateful)."""
-        client = MQTTClient(mqtt_config, uns_config)
-        assert client.current_level == ComplexityLevel.LEVEL_2_STATEFUL
+        assert client.current_level is ComplexityLevel.LEVEL_2_STATEFUL
 
-    def test_set_level_updates_current_level(self, mqtt_config, uns_config):
+    def test_set_level_updates_current_level(self, client):
         """Setting level should update current_level property."""
-        client = MQTTClient(mqtt_config, uns_config)
-
         client.set_level(ComplexityLevel.LEVEL_1_SENSORS)
-        assert client.current_level == ComplexityLevel.LEVEL_1_SENSORS
+        assert client.current_level is ComplexityLevel.LEVEL_1_SENSORS
 
         client.set_level(ComplexityLevel.LEVEL_3_ERP_MES)
-        assert client.current_level == ComplexityLevel.LEVEL_3_ERP_MES
+        assert client.current_level is ComplexityLevel.LEVEL_3_ERP_MES
 
         client.set_level(ComplexityLevel.LEVEL_4_FULL)
-        assert client.current_level == ComplexityLevel.LEVEL_4_FULL
+        assert client.current_level is ComplexityLevel.LEVEL_4_FULL
 
-    def test_set_level_calls_callback(self, mqtt_config, uns_config):
+    def test_set_level_calls_callback(self, make_client):
         """Setting level should trigger the on_level_change callback."""
         callback_log = []
-        client = MQTTClient(
-            mqtt_config, uns_config, on_level_change=lambda l: callback_log.append(l)
-        )
+        client = make_client(on_level_change=lambda l: callback_log.append(l))
 
         client.set_level(ComplexityLevel.LEVEL_3_ERP_MES)
 
         assert len(callback_log) == 1
-        assert callback_log[0] == ComplexityLevel.LEVEL_3_ERP_MES
+        assert callback_log[0] is ComplexityLevel.LEVEL_3_ERP_MES
 
-    def test_set_level_no_callback_when_same_level(self, mqtt_config, uns_config):
+    def test_set_level_no_callback_when_same_level(self, make_client):
         """Setting the same level should not trigger callback."""
         callback_log = []
-        client = MQTTClient(
-            mqtt_config, uns_config, on_level_change=lambda l: callback_log.append(l)
-        )
+        client = make_client(on_level_change=lambda l: callback_log.append(l))
 
         # Set to current level (Level 2)
         client.set_level(ComplexityLevel.LEVEL_2_STATEFUL)
 
         assert len(callback_log) == 0
 
-    def test_level_change_via_mqtt_message(self, mqtt_config, uns_config):
+    @pytest.mark.parametrize("level", list(LEVEL_PAYLOADS))
+    def test_level_change_via_mqtt_message(self, client, level):
         """Simulate receiving a level change message via MQTT."""
-        client = MQTTClient(mqtt_config, uns_config)
         client._connected = True
 
         # Simulate incoming MQTT message (uses root-level topic)
         mock_msg = MagicMock()
         mock_msg.topic = MQTTClient.LEVEL_CONTROL_TOPIC  # metalfab-sim/settings/level
-        mock_msg.payload = json.dumps({"level": 4}).encode()
+        mock_msg.payload = LEVEL_PAYLOADS[level]
 
         client._on_message(None, None, mock_msg)
 
-        assert client.current_level == ComplexityLevel.LEVEL_4_FULL
+        assert client.current_level == level
 
-    def test_level_change_via_mqtt_handles_invalid_json(self, mqtt_config, uns_config):
+    def test_level_change_via_mqtt_handles_invalid_json(self, client):
         """Invalid JSON in level message should not crash."""
-        client = MQTTClient(mqtt_config, uns_config)
         original_level = client.current_level
 
         mock_msg = MagicMock()
@@ -92,9 +119,8 @@ class TestLevelSwitcherMQTTClient:
         # Level should remain unchanged
         assert client.current_level == original_level
 
-    def test_level_change_via_mqtt_handles_invalid_level(self, mqtt_config, uns_config):
+    def test_level_change_via_mqtt_handles_invalid_level(self, client):
         """Invalid level value should not crash."""
-        client = MQTTClient(mqtt_config, uns_config)
         original_level = client.current_level
 
         mock_msg = MagicMock()
@@ -107,9 +133,8 @@ class TestLevelSwitcherMQTTClient:
         # Level should remain unchanged
         assert client.current_level == original_level
 
-    def test_publish_filtered_by_level(self, mqtt_config, uns_config):
+    def test_publish_filtered_by_level(self, client):
         """Messages requiring higher level should be filtered."""
-        client = MQTTClient(mqtt_config, uns_config)
         client._connected = True
         client._current_level = ComplexityLevel.LEVEL_1_SENSORS
 
@@ -137,9 +162,8 @@ class TestLevelSwitcherMQTTClient:
         )
         assert result3 is False
 
-    def test_publish_allowed_at_higher_level(self, mqtt_config, uns_config):
+    def test_publish_allowed_at_higher_level(self, client):
         """Messages requiring lower level should pass at higher level."""
-        client = MQTTClient(mqtt_config, uns_config)
         client._connected = True
         client._current_level = ComplexityLevel.LEVEL_4_FULL
 
@@ -154,31 +178,18 @@ class TestLevelSwitcherSimulator:
     """Tests for level switching in Simulator."""
 
     @pytest.fixture
-    def config(self):
-        return Config.default()
-
-    @pytest.fixture
-    def mock_mqtt(self):
-        mqtt = MagicMock()
-        mqtt.connected = True
-        mqtt.connect.return_value = True
-        mqtt.publish.return_value = True
-        mqtt.base_topic = "umh/v1/test/site"
-        return mqtt
-
-    @pytest.fixture
-    def simulator(self, config, mock_mqtt):
-        return Simulator(config, mqtt_client=mock_mqtt)
+    def config(self, default_config):
+        return default_config
 
     def test_simulator_level_property(self, simulator):
         """Simulator should expose level property."""
-        assert simulator.level == ComplexityLevel.LEVEL_2_STATEFUL
+        assert simulator.level is ComplexityLevel.LEVEL_2_STATEFUL
 
     def test_simulator_set_level_updates_mqtt(self, simulator, mock_mqtt):
         """Setting simulator level should update MQTT client."""
         simulator.level = ComplexityLevel.LEVEL_3_ERP_MES
 
-        mock_mqtt.set_level.assert_called_with(ComplexityLevel.LEVEL_3_ERP_MES)
+        assert mock_mqtt.levels_set[-1] is ComplexityLevel.LEVEL_3_ERP_MES
 
     def test_simulator_responds_to_level_callback(self, config, mock_mqtt):
         """Simulator should update when MQTT client changes level."""
@@ -187,12 +198,11 @@ class TestLevelSwitcherSimulator:
         # Simulate level change from MQTT
         sim._on_level_change(ComplexityLevel.LEVEL_4_FULL)
 
-        assert sim._level == ComplexityLevel.LEVEL_4_FULL
+        assert sim._level is ComplexityLevel.LEVEL_4_FULL
 
     def test_simulator_publishes_based_on_level(self, config, mock_mqtt):
         """Simulator should pass correct required_level to publish calls."""
         sim = Simulator(config, mqtt_client=mock_mqtt)
-        sim._generate_initial_jobs()
 
         # Run one tick at Level 1
         sim._level = ComplexityLevel.LEVEL_1_SENSORS
@@ -201,8 +211,8 @@ class TestLevelSwitcherSimulator:
 
         # Check that publish was called with Level 1 requirement for sensors
         sensor_calls = [
-            c for c in mock_mqtt.publish.call_args_list
-            if "_raw" in str(c)
+            topic for topic, level in mock_mqtt.publishes
+            if "_raw" in topic and level == ComplexityLevel.LEVEL_1_SENSORS
         ]
         assert len(sensor_calls) > 0
 
@@ -280,17 +290,8 @@ class TestLevelTransitions:
     """Tests for transitions between levels."""
 
     @pytest.fixture
-    def config(self):
-        return Config.default()
-
-    @pytest.fixture
-    def mock_mqtt(self):
-        mqtt = MagicMock()
-        mqtt.connected = True
-        mqtt.connect.return_value = True
-        mqtt.publish.return_value = True
-        mqtt.base_topic = "umh/v1/test/site"
-        return mqtt
+    def config(self, default_config):
+        return default_config
 
     def test_upgrade_from_level_1_to_4(self, config, mock_mqtt):
         """Upgrading from Level 1 to 4 should enable all features."""
@@ -298,22 +299,18 @@ class TestLevelTransitions:
         sim._generate_initial_jobs()
 
         # Start at Level 1
-        sim._level = ComplexityLevel.LEVEL_1_SENSORS
-        mock_mqtt.publish.reset_mock()
-        sim._tick_count = 30  # Trigger all periodic tasks
-        sim._tick()
-
-        level_1_calls = len(mock_mqtt.publish.call_args_list)
+        sim._on_level_change(ComplexityLevel.LEVEL_1_SENSORS)
+        level_1_features = _enabled_features(sim._features)
+        assert _tick_levels(sim, mock_mqtt) == {ComplexityLevel.LEVEL_1_SENSORS}
 
         # Upgrade to Level 4
-        sim._level = ComplexityLevel.LEVEL_4_FULL
-        mock_mqtt.publish.reset_mock()
-        sim._tick()
-
-        level_4_calls = len(mock_mqtt.publish.call_args_list)
+        sim._on_level_change(ComplexityLevel.LEVEL_4_FULL)
+        level_4_features = _enabled_features(sim._features)
 
-        # Level 4 should have more publish calls
-        assert level_4_calls > level_1_calls
+        # Level 4 keeps everything from Level 1 and adds more
+        assert sim._features == get_features_for_level(ComplexityLevel.LEVEL_4_FULL)
+        assert level_1_features < level_4_features
+        assert ComplexityLevel.LEVEL_4_FULL in _tick_levels(sim, mock_mqtt)
 
     def test_downgrade_from_level_4_to_1(self, config, mock_mqtt):
         """Downgrading from Level 4 to 1 should reduce features."""
@@ -321,19 +318,15 @@ class TestLevelTransitions:
         sim._generate_initial_jobs()
 
         # Start at Level 4
-        sim._level = ComplexityLevel.LEVEL_4_FULL
-        mock_mqtt.publish.reset_mock()
-        sim._tick_count = 30
-        sim._tick()
-
-        level_4_calls = len(mock_mqtt.publish.call_args_list)
+        sim._on_level_change(ComplexityLevel.LEVEL_4_FULL)
+        level_4_features = _enabled_features(sim._features)
+        assert ComplexityLevel.LEVEL_4_FULL in _tick_levels(sim, mock_mqtt)
 
         # Downgrade to Level 1
-        sim._level = ComplexityLevel.LEVEL_1_SENSORS
-        mock_mqtt.publish.reset_mock()
-        sim._tick()
-
-        level_1_calls = len(mock_mqtt.publish.call_args_list)
+        sim._on_level_change(ComplexityLevel.LEVEL_1_SENSORS)
+        level_1_features = _enabled_features(sim._features)
 
-        # Level 1 should have fewer publish calls
-        assert level_1_calls < level_4_calls
+        # Level 1 should have fewer features and publish only sensor data
+        assert sim._features == get_features_for_level(ComplexityLevel.LEVEL_1_SENSORS)
+        assert level_1_features < level_4_features
+        assert _tick_levels(sim, mock_mqtt) == {ComplexityLevel.LEVEL_1_SENSORS}
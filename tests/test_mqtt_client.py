@@ -2,7 +2,7 @@
 
 import json
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 from metalfab_uns_sim.complexity import ComplexityLevel
 from metalfab_uns_sim.config import MQTTConfig, UNSConfig
@@ -12,16 +12,18 @@ from metalfab_uns_sim.mqtt_client import MQTTClient, Message
 class TestMQTTClient:
     """Tests for MQTTClient."""
 
-    @pytest.fixture
-    def mqtt_config(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mqtt_config(cls):
         return MQTTConfig(
             broker="localhost",
             port=1883,
             client_id="test-client",
         )
 
-    @pytest.fixture
-    def uns_config(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def uns_config(cls):
         return UNSConfig(
             enterprise="test_enterprise",
             site="test_site",
@@ -36,7 +38,7 @@ class TestMQTTClient:
         assert client.base_topic == "umh/v1/test_enterprise/test_site"
 
     def test_initial_level(self, client):
-        assert client.current_level == ComplexityLevel.LEVEL_2_STATEFUL
+        assert client.current_level is ComplexityLevel.LEVEL_2_STATEFUL
 
     def test_set_level(self, client):
         callback_called = []
@@ -44,9 +46,9 @@ class TestMQTTClient:
 
         client.set_level(ComplexityLevel.LEVEL_3_ERP_MES)
 
-        assert client.current_level == ComplexityLevel.LEVEL_3_ERP_MES
+        assert client.current_level is ComplexityLevel.LEVEL_3_ERP_MES
         assert len(callback_called) == 1
-        assert callback_called[0] == ComplexityLevel.LEVEL_3_ERP_MES
+        assert callback_called[0] is ComplexityLevel.LEVEL_3_ERP_MES
 
     def test_publish_respects_level(self, client):
         client._current_level = ComplexityLevel.LEVEL_1_SENSORS
@@ -68,6 +70,119 @@ class TestMQTTClient:
         )
         assert result2 is False
 
+    def test_publish_qos_override(self, client):
+        client._current_level = ComplexityLevel.LEVEL_1_SENSORS
+
+        client.publish("a/_raw/x", {"value": 1}, qos=0)
+        client.publish("a/_raw/y", {"value": 2})
+
+        assert client._publish_queue.get_nowait().qos == 0
+        assert client._publish_queue.get_nowait().qos == client.mqtt_config.qos
+
+    def test_publish_many_queues_batch(self, client):
+        client._current_level = ComplexityLevel.LEVEL_2_STATEFUL
+        payload = {"value": 1}
+
+        result = client.publish_many(
+            [("a/_state", payload), ("b/_state", payload)],
+            retain=True,
+            required_level=ComplexityLevel.LEVEL_2_STATEFUL,
+        )
+
+        assert result is True
+        assert client._publish_queue.qsize() == 1
+        batch = client._publish_queue.get_nowait()
+        assert len(batch) == 2
+        assert batch[0].topic == "umh/v1/test_enterprise/test_site/a/_state"
+        assert batch[0].retain is True
+
+    def test_publish_many_respects_level(self, client):
+        client._current_level = ComplexityLevel.LEVEL_1_SENSORS
+
+        result = client.publish_many(
+            [("a/_state", {"value": 1})],
+            required_level=ComplexityLevel.LEVEL_2_STATEFUL,
+        )
+
+        assert result is False
+        assert client._publish_queue.empty()
+
+    def test_publish_bytes_queues_serialized_payload(self, client):
+        client._current_level = ComplexityLevel.LEVEL_2_STATEFUL
+
+        result = client.publish_bytes(
+            "a/_state", b'{"value": 1}', required_level=ComplexityLevel.LEVEL_2_STATEFUL
+        )
+
+        assert result is True
+        assert client._publish_queue.get_nowait().payload == b'{"value": 1}'
+
+    def test_publish_batch_encodes_shared_payload_once(self, client):
+        client._client = MagicMock()
+        client._client.publish.return_value.rc = 0
+        client._connected = True
+        payload = {"value": 1}
+
+        client._publish_batch(
+            [Message(topic="a", payload=payload), Message(topic="b", payload=payload)]
+        )
+
+        first = client._client.publish.call_args_list[0].args[1]
+        second = client._client.publish.call_args_list[1].args[1]
+        assert json.loads(first) == payload
+        assert second is first
+
+    def test_mutated_payload_is_reencoded(self, client):
+        client._client = MagicMock()
+        client._client.publish.return_value.rc = 0
+        client._connected = True
+        payload = {"value": 1}
+
+        client._do_publish(Message(topic="a", payload=payload))
+        payload["value"] = 2
+        client._do_publish(Message(topic="a", payload=payload))
+
+        assert json.loads(client._client.publish.call_args_list[1].args[1]) == {"value": 2}
+
+    def test_unchanged_retained_payload_skipped(self, client):
+        client._client = MagicMock()
+        client._client.publish.return_value.rc = 0
+        client._connected = True
+
+        client._do_publish(Message(topic="a", payload=b'{"v": 1}', retain=True))
+        client._do_publish(Message(topic="a", payload=b'{"v": 1}', retain=True))
+        assert client._client.publish.call_count == 1
+
+        client._do_publish(Message(topic="a", payload=b'{"v": 2}', retain=True))
+        client._do_publish(Message(topic="b", payload=b'{"v": 1}', retain=False))
+        client._do_publish(Message(topic="b", payload=b'{"v": 1}', retain=False))
+        assert client._client.publish.call_count == 4
+
+    def test_changed_retained_payload_republished(self, client):
+        client._client = MagicMock()
+        client._client.publish.return_value.rc = 0
+        client._connected = True
+        payload = {"v": 1}
+
+        client._do_publish(Message(topic="a", payload=payload, retain=True))
+        payload["v"] = 2
+        client._do_publish(Message(topic="a", payload=payload, retain=True))
+
+        sent = [json.loads(c.args[1]) for c in client._client.publish.call_args_list]
+        assert sent == [{"v": 1}, {"v": 2}]
+
+    def test_reconnect_resends_retained_payloads(self, client):
+        client._client = MagicMock()
+        client._client.publish.return_value.rc = 0
+        client._connected = True
+        msg = Message(topic="a", payload=b'{"v": 1}', retain=True)
+
+        client._do_publish(msg)
+        client._on_connect(client._client, None, {}, 0)
+        client._do_publish(msg)
+
+        assert client._client.publish.call_count == 2
+
     def test_dry_run_connect(self, client):
         result = client.connect(dry_run=True)
 
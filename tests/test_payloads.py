@@ -9,7 +9,6 @@ Validates that all message types have:
 
 import re
 from datetime import datetime
-from typing import Any, Dict, List
 
 import pytest
 
@@ -23,27 +22,31 @@ from metalfab_uns_sim.generators import (
     SensorGenerator,
     create_sensor_generators,
 )
-from metalfab_uns_sim.config import Config
-from metalfab_uns_sim.simulator import Simulator, CellState
 
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+_MIN_TIMESTAMP_MS = 1577836800000  # 2020-01-01
+_MAX_TIMESTAMP_MS = 4102444800000  # 2100-01-01
+_ISO_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+
 
 def validate_timestamp_ms(value: int) -> bool:
     """Validate timestamp is a reasonable millisecond epoch."""
     # Should be after 2020 and before 2100
-    min_ts = 1577836800000  # 2020-01-01
-    max_ts = 4102444800000  # 2100-01-01
-    return min_ts < value < max_ts
+    return _MIN_TIMESTAMP_MS < value < _MAX_TIMESTAMP_MS
 
 
 def validate_iso_timestamp(value: str) -> bool:
     """Validate ISO 8601 timestamp format."""
-    pattern = r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"
-    return bool(re.match(pattern, value))
+    return _ISO_TIMESTAMP_RE.match(value) is not None
+
+
+def validate_sensor_reading(payload: dict) -> bool:
+    """Validate a _raw reading has a timestamp and a numeric value."""
+    return "timestamp_ms" in payload and isinstance(payload.get("value"), (int, float))
 
 
 def validate_percentage(value: float) -> bool:
@@ -51,10 +54,74 @@ def validate_percentage(value: float) -> bool:
     return 0.0 <= value <= 100.0
 
 
+@pytest.fixture(scope="module")
+def erp_mes_gen():
+    """ERP/MES generator shared by the module; tests only check value ranges."""
+    return ERPMESGenerator()
+
+
+@pytest.fixture(scope="module")
+def sample_jobs():
+    """Two queued jobs, shared read-only by the metrics tests."""
+    return [
+        Job("J1", "WO1", "Job 1", "C1"),
+        Job("J2", "WO2", "Job 2", "C2"),
+    ]
+
+
+@pytest.fixture(scope="module")
+def in_progress_jobs():
+    """Two in-progress jobs, shared read-only by the dashboard tests."""
+    return [
+        Job("J1", "WO1", "Job 1", "C1", status=JobStatus.IN_PROGRESS),
+        Job("J2", "WO2", "Job 2", "C2", status=JobStatus.IN_PROGRESS),
+    ]
+
+
+@pytest.fixture(scope="module")
+def sample_states():
+    """Machine states with two of three machines running."""
+    return {
+        "laser_01": PackMLState.EXECUTE,
+        "laser_02": PackMLState.IDLE,
+        "press_01": PackMLState.EXECUTE,
+    }
+
+
 # =============================================================================
 # Sensor Payload Tests (Level 1 - _raw)
 # =============================================================================
 
+# Sensors each cell type must provide
+EXPECTED_CELL_SENSORS = {
+    "laser_cutter": ["laser_power_pct", "cutting_speed_mmpm", "power_kw"],
+    "press_brake": ["tonnage_t", "bend_angle_deg", "power_kw"],
+    "robot_weld": ["weld_current_a", "weld_voltage_v", "wire_feed_mpm"],
+    "paint_booth": ["temp_c", "humidity_pct", "airflow_cfm"],
+    "agv": ["battery_pct", "speed_mps"],
+}
+
+
+# One (cell_type, sensor_id) case per expected sensor
+CELL_SENSOR_CASES = [
+    (cell_type, sensor_id)
+    for cell_type, sensor_ids in EXPECTED_CELL_SENSORS.items()
+    for sensor_id in sensor_ids
+]
+
+
+@pytest.fixture(scope="module")
+def cell_sensors():
+    """Look up sensor generators by cell type, building each type once per module."""
+    built = {}
+
+    def sensors_for(cell_type):
+        if cell_type not in built:
+            built[cell_type] = create_sensor_generators(cell_type)
+        return built[cell_type]
+
+    return sensors_for
+
 
 class TestSensorPayloads:
     """Tests for sensor/historian payloads."""
@@ -76,19 +143,28 @@ class TestSensorPayloads:
 
         assert validate_timestamp_ms(payload["timestamp_ms"])
 
-    def test_sensor_value_respects_range(self):
+    @pytest.mark.parametrize(
+        "base,minimum,maximum,noise",
+        [
+            (50.0, 10.0, 90.0, 5.0),
+            (95.0, 0.0, 100.0, 10.0),  # Noise pushes past the max
+            (1.0, 0.0, 1000.0, 20.0),  # Noise pushes below the min
+            (0.0, -1.0, 1.0, 5.0),  # Noise wider than the whole range
+        ],
+    )
+    def test_sensor_value_respects_range(self, base, minimum, maximum, noise):
         """Sensor value should be within configured min/max."""
         gen = SensorGenerator(
             "test_sensor",
-            base_value=50.0,
-            min_value=10.0,
-            max_value=90.0,
-            noise_stddev=5.0,
+            base_value=base,
+            min_value=minimum,
+            max_value=maximum,
+            noise_stddev=noise,
         )
 
-        for _ in range(100):
-            payload = gen.generate()
-            assert 10.0 <= payload["value"] <= 90.0
+        values = [gen.generate()["value"] for _ in range(100)]
+        assert minimum <= min(values)
+        assert max(values) <= maximum
 
     def test_extended_sensor_payload_structure(self):
         """Extended sensor payload should include metadata."""
@@ -106,26 +182,17 @@ class TestSensorPayloads:
         assert payload["sensor_id"] == "power_kw"
 
     @pytest.mark.parametrize(
-        "cell_type,expected_sensors",
-        [
-            ("laser_cutter", ["laser_power_pct", "cutting_speed_mmpm", "power_kw"]),
-            ("press_brake", ["tonnage_t", "bend_angle_deg", "power_kw"]),
-            ("robot_weld", ["weld_current_a", "weld_voltage_v", "wire_feed_mpm"]),
-            ("paint_booth", ["temp_c", "humidity_pct", "airflow_cfm"]),
-            ("agv", ["battery_pct", "speed_mps"]),
-        ],
+        "cell_type,sensor_id", CELL_SENSOR_CASES, ids=[f"{c}-{s}" for c, s in CELL_SENSOR_CASES]
     )
-    def test_cell_type_sensors_generate_valid_payloads(self, cell_type, expected_sensors):
+    def test_cell_type_sensors_generate_valid_payloads(self, cell_sensors, cell_type, sensor_id):
         """Each cell type should generate valid sensor payloads."""
-        sensors = create_sensor_generators(cell_type)
+        sensors = cell_sensors(cell_type)
+        assert sensor_id in sensors, f"Missing sensor {sensor_id} for {cell_type}"
 
-        for sensor_id in expected_sensors:
-            assert sensor_id in sensors, f"Missing sensor {sensor_id} for {cell_type}"
-
-            payload = sensors[sensor_id].generate()
-            assert "timestamp_ms" in payload
-            assert "value" in payload
-            assert isinstance(payload["value"], (int, float))
+        payload = sensors[sensor_id].generate()
+        assert "timestamp_ms" in payload
+        assert "value" in payload
+        assert isinstance(payload["value"], (int, float))
 
 
 # =============================================================================
@@ -136,10 +203,10 @@ class TestSensorPayloads:
 class TestJobPayloads:
     """Tests for job state and ERP payloads."""
 
-    @pytest.fixture
-    def sample_job(self):
-        """Create a sample job for testing."""
-        from datetime import datetime, timedelta
+    @pytest.fixture(scope="class")
+    @classmethod
+    def sample_job(cls):
+        """Create a sample job for testing (read-only, shared by the class)."""
         return Job(
             job_id="JOB_9942",
             job_number="WO-9942",
@@ -158,7 +225,7 @@ class TestJobPayloads:
             material_cost=1250.00,
             quoted_price=3750.00,
             margin_pct=33.3,
-            due_date=datetime.now() + timedelta(days=5),  # 5 days ahead = AHEAD status
+            due_date=datetime(2099, 1, 1),  # Fixed and far ahead = AHEAD status
         )
 
     def test_job_state_payload_structure(self, sample_job):
@@ -230,6 +297,7 @@ class TestJobPayloads:
 
         valid_statuses = ["AHEAD", "ON_TIME", "LATE"]
         assert payload["lead_time_status"] in valid_statuses
+        assert payload["lead_time_status"] == "AHEAD"
 
     def test_job_generator_creates_valid_jobs(self):
         """JobGenerator should create jobs with valid payloads."""
@@ -265,9 +333,35 @@ class TestJobPayloads:
 class TestERPMESPayloads:
     """Tests for ERP/MES enrichment payloads."""
 
-    @pytest.fixture
-    def erp_mes_gen(self):
-        return ERPMESGenerator()
+    # Required top-level keys per payload
+    _ENERGY_KEYS = frozenset({
+        "kwh_today", "kwh_this_shift", "cost_per_kwh_eur", "total_cost_today_eur",
+        "avg_cost_per_order_eur", "timestamp_ms",
+    })
+    _QUALITY_KEYS = frozenset({
+        "cell_id", "quality_pct", "defect_rate_pct", "scrap_count_today", "rework_count_today",
+        "first_pass_yield_pct", "timestamp_ms",
+    })
+    _OEE_KEYS = frozenset({
+        "cell_id", "oee_pct", "availability_pct", "performance_pct", "quality_pct",
+        "idle_time_min", "downtime_min", "period", "timestamp_ms",
+    })
+    _DELIVERY_KEYS = frozenset({
+        "on_time_pct", "late_orders", "orders_shipping_today", "orders_due_this_week",
+        "avg_lead_time_days", "timestamp_ms",
+    })
+    _INVENTORY_KEYS = frozenset({
+        "wip_value_eur", "wip_orders", "inventory_turns_yr", "raw_material_value_eur",
+        "finished_goods_value_eur", "timestamp_ms",
+    })
+    _UTILIZATION_KEYS = frozenset({
+        "fleet_utilization_pct", "machines_running", "machines_total", "machines_idle",
+        "bottleneck_cell", "bottleneck_queue_hours", "timestamp_ms",
+    })
+    _QUOTE_KEYS = frozenset({
+        "quote_id", "margin_pct", "est_vs_actual_hours", "quotes_pending",
+        "quotes_won_this_month", "win_rate_pct", "avg_quote_value_eur", "timestamp_ms",
+    })
 
     # -------------------------------------------------------------------------
     # Energy Metrics
@@ -278,12 +372,8 @@ class TestERPMESPayloads:
         cells = [{"power_kw": 10}, {"power_kw": 20}]
         payload = erp_mes_gen.generate_energy_metrics(cells)
 
-        assert "kwh_today" in payload
-        assert "kwh_this_shift" in payload
-        assert "cost_per_kwh_eur" in payload
-        assert "total_cost_today_eur" in payload
-        assert "avg_cost_per_order_eur" in payload
-        assert "timestamp_ms" in payload
+        missing = self._ENERGY_KEYS - payload.keys()
+        assert not missing, missing
 
     def test_energy_metrics_payload_values(self, erp_mes_gen):
         """Energy metrics should have valid values."""
@@ -303,13 +393,8 @@ class TestERPMESPayloads:
         """Quality metrics should have required fields."""
         payload = erp_mes_gen.generate_quality_metrics("weld_cell_01")
 
-        assert "cell_id" in payload
-        assert "quality_pct" in payload
-        assert "defect_rate_pct" in payload
-        assert "scrap_count_today" in payload
-        assert "rework_count_today" in payload
-        assert "first_pass_yield_pct" in payload
-        assert "timestamp_ms" in payload
+        missing = self._QUALITY_KEYS - payload.keys()
+        assert not missing, missing
 
     def test_quality_metrics_payload_values(self, erp_mes_gen):
         """Quality metrics should have valid values."""
@@ -330,15 +415,8 @@ class TestERPMESPayloads:
         """OEE metrics should have required fields."""
         payload = erp_mes_gen.generate_oee_metrics("press_brake_01")
 
-        assert "cell_id" in payload
-        assert "oee_pct" in payload
-        assert "availability_pct" in payload
-        assert "performance_pct" in payload
-        assert "quality_pct" in payload
-        assert "idle_time_min" in payload
-        assert "downtime_min" in payload
-        assert "period" in payload
-        assert "timestamp_ms" in payload
+        missing = self._OEE_KEYS - payload.keys()
+        assert not missing, missing
 
     def test_oee_metrics_payload_values(self, erp_mes_gen):
         """OEE metrics should have valid values."""
@@ -369,25 +447,16 @@ class TestERPMESPayloads:
     # Delivery Metrics
     # -------------------------------------------------------------------------
 
-    def test_delivery_metrics_payload_structure(self, erp_mes_gen):
+    def test_delivery_metrics_payload_structure(self, erp_mes_gen, sample_jobs):
         """Delivery metrics should have required fields."""
-        jobs = [Job("J1", "WO1", "Job 1", "C1")]
-        payload = erp_mes_gen.generate_delivery_metrics(jobs)
-
-        assert "on_time_pct" in payload
-        assert "late_orders" in payload
-        assert "orders_shipping_today" in payload
-        assert "orders_due_this_week" in payload
-        assert "avg_lead_time_days" in payload
-        assert "timestamp_ms" in payload
+        payload = erp_mes_gen.generate_delivery_metrics(sample_jobs)
+
+        missing = self._DELIVERY_KEYS - payload.keys()
+        assert not missing, missing
 
-    def test_delivery_metrics_payload_values(self, erp_mes_gen):
+    def test_delivery_metrics_payload_values(self, erp_mes_gen, sample_jobs):
         """Delivery metrics should have valid values."""
-        jobs = [
-            Job("J1", "WO1", "Job 1", "C1"),
-            Job("J2", "WO2", "Job 2", "C2"),
-        ]
-        payload = erp_mes_gen.generate_delivery_metrics(jobs)
+        payload = erp_mes_gen.generate_delivery_metrics(sample_jobs)
 
         assert validate_percentage(payload["on_time_pct"])
         assert payload["late_orders"] >= 0
@@ -403,12 +472,8 @@ class TestERPMESPayloads:
         jobs = []
         payload = erp_mes_gen.generate_inventory_metrics(jobs)
 
-        assert "wip_value_eur" in payload
-        assert "wip_orders" in payload
-        assert "inventory_turns_yr" in payload
-        assert "raw_material_value_eur" in payload
-        assert "finished_goods_value_eur" in payload
-        assert "timestamp_ms" in payload
+        missing = self._INVENTORY_KEYS - payload.keys()
+        assert not missing, missing
 
     def test_inventory_metrics_payload_values(self, erp_mes_gen):
         """Inventory metrics should have valid values."""
@@ -424,27 +489,16 @@ class TestERPMESPayloads:
     # Machine Utilization
     # -------------------------------------------------------------------------
 
-    def test_machine_utilization_payload_structure(self, erp_mes_gen):
+    def test_machine_utilization_payload_structure(self, erp_mes_gen, sample_states):
         """Machine utilization should have required fields."""
-        states = {"laser_01": PackMLState.EXECUTE, "laser_02": PackMLState.IDLE}
-        payload = erp_mes_gen.generate_machine_utilization(states)
-
-        assert "fleet_utilization_pct" in payload
-        assert "machines_running" in payload
-        assert "machines_total" in payload
-        assert "machines_idle" in payload
-        assert "bottleneck_cell" in payload
-        assert "bottleneck_queue_hours" in payload
-        assert "timestamp_ms" in payload
+        payload = erp_mes_gen.generate_machine_utilization(sample_states)
+
+        missing = self._UTILIZATION_KEYS - payload.keys()
+        assert not missing, missing
 
-    def test_machine_utilization_payload_values(self, erp_mes_gen):
+    def test_machine_utilization_payload_values(self, erp_mes_gen, sample_states):
         """Machine utilization should have valid values."""
-        states = {
-            "laser_01": PackMLState.EXECUTE,
-            "laser_02": PackMLState.IDLE,
-            "press_01": PackMLState.EXECUTE,
-        }
-        payload = erp_mes_gen.generate_machine_utilization(states)
+        payload = erp_mes_gen.generate_machine_utilization(sample_states)
 
         assert validate_percentage(payload["fleet_utilization_pct"])
         assert payload["machines_running"] == 2
@@ -460,14 +514,8 @@ class TestERPMESPayloads:
         """Quote metrics should have required fields."""
         payload = erp_mes_gen.generate_quote_metrics()
 
-        assert "quote_id" in payload
-        assert "margin_pct" in payload
-        assert "est_vs_actual_hours" in payload
-        assert "quotes_pending" in payload
-        assert "quotes_won_this_month" in payload
-        assert "win_rate_pct" in payload
-        assert "avg_quote_value_eur" in payload
-        assert "timestamp_ms" in payload
+        missing = self._QUOTE_KEYS - payload.keys()
+        assert not missing, missing
 
     def test_quote_metrics_payload_values(self, erp_mes_gen):
         """Quote metrics should have valid values."""
@@ -488,43 +536,31 @@ class TestERPMESPayloads:
 class TestDashboardPayloads:
     """Tests for dashboard/aggregated payloads."""
 
-    @pytest.fixture
-    def erp_mes_gen(self):
-        return ERPMESGenerator()
+    # Required top-level sections
+    _DASHBOARD_KEYS = frozenset({"shift", "jobs", "production", "machines", "energy", "_updated_at"})
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def dashboard_payload(cls, erp_mes_gen, in_progress_jobs, sample_states):
+        """One dashboard summary shared by the class; the tests only read it."""
+        return erp_mes_gen.generate_dashboard_summary(in_progress_jobs, sample_states)
 
-    def test_dashboard_summary_payload_structure(self, erp_mes_gen):
+    def test_dashboard_summary_payload_structure(self, dashboard_payload):
         """Dashboard summary should have required nested sections."""
-        jobs = [Job("J1", "WO1", "Job 1", "C1")]
-        states = {"laser_01": PackMLState.EXECUTE}
-        payload = erp_mes_gen.generate_dashboard_summary(jobs, states)
-
-        # Top-level sections
-        assert "shift" in payload
-        assert "jobs" in payload
-        assert "production" in payload
-        assert "machines" in payload
-        assert "energy" in payload
-        assert "_updated_at" in payload
+        missing = self._DASHBOARD_KEYS - dashboard_payload.keys()
+        assert not missing, missing
 
-    def test_dashboard_shift_section(self, erp_mes_gen):
+    def test_dashboard_shift_section(self, dashboard_payload):
         """Dashboard shift section should have valid values."""
-        payload = erp_mes_gen.generate_dashboard_summary([], {})
-
-        shift = payload["shift"]
+        shift = dashboard_payload["shift"]
         assert "current" in shift
         assert "start" in shift
         assert shift["current"] in ["DAY", "EVENING", "NIGHT"]
         assert validate_iso_timestamp(shift["start"])
 
-    def test_dashboard_jobs_section(self, erp_mes_gen):
+    def test_dashboard_jobs_section(self, dashboard_payload):
         """Dashboard jobs section should have valid values."""
-        jobs = [
-            Job("J1", "WO1", "Job 1", "C1", status=JobStatus.IN_PROGRESS),
-            Job("J2", "WO2", "Job 2", "C2", status=JobStatus.IN_PROGRESS),
-        ]
-        payload = erp_mes_gen.generate_dashboard_summary(jobs, {})
-
-        jobs_section = payload["jobs"]
+        jobs_section = dashboard_payload["jobs"]
         assert "active" in jobs_section
         assert "completed_today" in jobs_section
         assert "on_time_pct" in jobs_section
@@ -533,11 +569,9 @@ class TestDashboardPayloads:
         assert jobs_section["completed_today"] >= 0
         assert validate_percentage(jobs_section["on_time_pct"])
 
-    def test_dashboard_production_section(self, erp_mes_gen):
+    def test_dashboard_production_section(self, dashboard_payload):
         """Dashboard production section should have valid values."""
-        payload = erp_mes_gen.generate_dashboard_summary([], {})
-
-        prod = payload["production"]
+        prod = dashboard_payload["production"]
         assert "parts_today" in prod
         assert "scrap_pct" in prod
         assert "throughput_per_hour" in prod
@@ -546,16 +580,9 @@ class TestDashboardPayloads:
         assert validate_percentage(prod["scrap_pct"])
         assert prod["throughput_per_hour"] >= 0
 
-    def test_dashboard_machines_section(self, erp_mes_gen):
+    def test_dashboard_machines_section(self, dashboard_payload):
         """Dashboard machines section should have valid values."""
-        states = {
-            "laser_01": PackMLState.EXECUTE,
-            "laser_02": PackMLState.IDLE,
-            "press_01": PackMLState.EXECUTE,
-        }
-        payload = erp_mes_gen.generate_dashboard_summary([], states)
-
-        machines = payload["machines"]
+        machines = dashboard_payload["machines"]
         assert "running" in machines
         assert "total" in machines
         assert "utilization_pct" in machines
@@ -564,11 +591,9 @@ class TestDashboardPayloads:
         assert machines["total"] == 3
         assert validate_percentage(machines["utilization_pct"])
 
-    def test_dashboard_energy_section(self, erp_mes_gen):
+    def test_dashboard_energy_section(self, dashboard_payload):
         """Dashboard energy section should have valid values."""
-        payload = erp_mes_gen.generate_dashboard_summary([], {})
-
-        energy = payload["energy"]
+        energy = dashboard_payload["energy"]
         assert "kwh_today" in energy
         assert "cost_eur" in energy
 
@@ -584,30 +609,25 @@ class TestDashboardPayloads:
 class TestMachineStatePayloads:
     """Tests for machine state payloads."""
 
+    # PackML state names from the ISA-TR88.00.02 state model
+    _VALID_PACKML_STATES = frozenset({
+        "STOPPED", "IDLE", "STARTING", "EXECUTE", "COMPLETING", "COMPLETED",
+        "RESETTING", "HOLDING", "HELD", "UNHOLDING", "SUSPENDING", "SUSPENDED",
+        "UNSUSPENDING", "ABORTING", "ABORTED", "CLEARING", "STOPPING",
+    })
+
     def test_packml_state_values(self):
         """PackML states should have valid string values."""
-        valid_states = [
-            "STOPPED", "IDLE", "STARTING", "EXECUTE", "COMPLETING", "COMPLETED",
-            "RESETTING", "HOLDING", "HELD", "UNHOLDING", "SUSPENDING", "SUSPENDED",
-            "UNSUSPENDING", "ABORTING", "ABORTED", "CLEARING", "STOPPING"
-        ]
-
-        for state in PackMLState:
-            assert state.value in valid_states
+        unknown = {state.value for state in PackMLState} - self._VALID_PACKML_STATES
+        assert not unknown, unknown
 
 
 class TestPayloadConsistency:
     """Tests for payload consistency across the system."""
 
     @pytest.fixture
-    def simulator(self):
-        config = Config.default()
-        mock_mqtt = pytest.importorskip("unittest.mock").MagicMock()
-        mock_mqtt.connected = True
-        mock_mqtt.connect.return_value = True
-        mock_mqtt.publish.return_value = True
-        mock_mqtt.base_topic = "umh/v1/test/site"
-        return Simulator(config, mqtt_client=mock_mqtt)
+    def simulator(self, shared_simulator):
+        return shared_simulator
 
     def test_all_cells_have_sensors(self, simulator):
         """Every cell should have at least one sensor generator."""
@@ -616,12 +636,10 @@ class TestPayloadConsistency:
 
     def test_all_sensors_generate_valid_payloads(self, simulator):
         """Every sensor should generate a valid payload."""
-        for cell_id, cell in simulator._cells.items():
-            for sensor_id, generator in cell.sensors.items():
-                payload = generator.generate()
-
-                assert "timestamp_ms" in payload, f"Missing timestamp in {cell_id}/{sensor_id}"
-                assert "value" in payload, f"Missing value in {cell_id}/{sensor_id}"
-                assert isinstance(
-                    payload["value"], (int, float)
-                ), f"Invalid value type in {cell_id}/{sensor_id}"
+        invalid = [
+            f"{cell_id}/{sensor_id}"
+            for cell_id, cell in simulator._cells.items()
+            for sensor_id, generator in cell.sensors.items()
+            if not validate_sensor_reading(generator.generate())
+        ]
+        assert not invalid, f"Invalid sensor payloads: {invalid}"
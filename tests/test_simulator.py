@@ -1,53 +1,141 @@
 """Tests for the main Simulator class."""
 
+import random
+from datetime import timedelta
+
 import pytest
 from unittest.mock import MagicMock, patch
 
 from metalfab_uns_sim.complexity import ComplexityLevel
-from metalfab_uns_sim.config import Config
-from metalfab_uns_sim.generators import PackMLState, JobStatus
-from metalfab_uns_sim.simulator import Simulator, CellState
+from metalfab_uns_sim.config import CellConfig
+from metalfab_uns_sim.generators import Job, MachineSubState, PackMLState, JobStatus
+from metalfab_uns_sim.simulator import CellState, Simulator
 
 
-class TestSimulator:
-    """Tests for Simulator class."""
+# CellState only reads its config, so tests can share these
+_LASER_CFG = CellConfig(id="test_cell", name="Test Cell", cell_type="laser_cutter")
+_PRESS_BRAKE_CFG = CellConfig(id="test_cell", name="Test Cell", cell_type="press_brake")
 
-    @pytest.fixture
-    def config(self):
-        return Config.default()
 
-    @pytest.fixture
-    def mock_mqtt(self):
-        mqtt = MagicMock()
-        mqtt.connected = True
-        mqtt.connect.return_value = True
-        mqtt.publish.return_value = True
-        mqtt.base_topic = "umh/v1/test/site"
-        return mqtt
+def _make_job(job_id, routing):
+    """Build a minimal job with a fixed id, skipping the random job generator."""
+    return Job(
+        job_id=job_id,
+        job_number=f"WO-{job_id}",
+        job_name="Test Job",
+        customer="Test",
+        routing=list(routing),
+    )
+
+
+def _add_queued(simulator, *jobs):
+    """Register jobs through the simulator and release them to the dispatch queue."""
+    for job in jobs:
+        simulator._add_job(job)
+    simulator._update_jobs()
 
-    @pytest.fixture
-    def simulator(self, config, mock_mqtt):
-        return Simulator(config, mqtt_client=mock_mqtt)
 
-    def test_init_creates_cells(self, simulator):
+class TestSimulatorInit:
+    """Tests for the freshly constructed Simulator."""
+
+    def test_init_creates_cells(self, shared_simulator):
         # Default config has cells from multiple areas
-        assert len(simulator._cells) > 0
-        assert "laser_01" in simulator._cells
-        assert "press_brake_01" in simulator._cells
+        assert len(shared_simulator._cells) > 0
+        assert "laser_01" in shared_simulator._cells
+        assert "press_brake_01" in shared_simulator._cells
 
-    def test_init_creates_sensor_generators(self, simulator):
-        laser = simulator._cells["laser_01"]
+    def test_init_creates_sensor_generators(self, shared_simulator):
+        laser = shared_simulator._cells["laser_01"]
         assert "laser_power_pct" in laser.sensors
         assert "power_kw" in laser.sensors
 
-    def test_level_property(self, simulator):
-        assert simulator.level == ComplexityLevel.LEVEL_2_STATEFUL
+    def test_level_property(self, shared_simulator):
+        assert shared_simulator.level is ComplexityLevel.LEVEL_2_STATEFUL
+
+
+class TestSimulator:
+    """Tests for Simulator class."""
 
     def test_set_level(self, simulator, mock_mqtt):
         simulator.level = ComplexityLevel.LEVEL_3_ERP_MES
 
-        assert simulator._level == ComplexityLevel.LEVEL_3_ERP_MES
-        mock_mqtt.set_level.assert_called_with(ComplexityLevel.LEVEL_3_ERP_MES)
+        assert simulator._level is ComplexityLevel.LEVEL_3_ERP_MES
+        assert mock_mqtt.levels_set[-1] is ComplexityLevel.LEVEL_3_ERP_MES
+
+    def test_set_level_refreshes_feature_cache(self, simulator):
+        assert simulator._dpp_enabled is False
+
+        simulator.level = ComplexityLevel.LEVEL_4_FULL
+
+        assert simulator._features.dpp is True
+        assert simulator._dpp_enabled is True
+
+    def test_powder_coating_planning_gated_below_level_3(self, simulator, mock_mqtt):
+        simulator._publish_powder_coating_planning()
+        assert not mock_mqtt.batches
+
+        simulator.level = ComplexityLevel.LEVEL_3_ERP_MES
+        simulator._publish_powder_coating_planning()
+
+        assert len(mock_mqtt.batches) == 2
+        assert {level for _, level in mock_mqtt.publishes} == {ComplexityLevel.LEVEL_3_ERP_MES}
+
+    @pytest.fixture
+    def broker_sim(self, default_config):
+        """Simulator on a real MQTTClient whose paho client is mocked."""
+        sim = Simulator(default_config)
+        client = sim._mqtt
+        client._client = MagicMock()
+        client._client.publish.return_value.rc = 0
+        client._connected = True
+        return sim
+
+    @staticmethod
+    def _flush(client):
+        """Run queued messages through _do_publish and return the topics sent."""
+        client._client.publish.reset_mock()
+        while not client._publish_queue.empty():
+            item = client._publish_queue.get_nowait()
+            for msg in item if isinstance(item, list) else [item]:
+                client._do_publish(msg)
+        return [c.args[0] for c in client._client.publish.call_args_list]
+
+    def test_zone_states_deduplicated_within_a_tick(self, broker_sim):
+        client = broker_sim._mqtt
+        oven_topic = f"{client.base_topic}/{broker_sim._powder_coating_line.topics['curing_state']}"
+
+        broker_sim._publish_powder_coating_state()
+        assert oven_topic in self._flush(client)
+
+        broker_sim._publish_powder_coating_state()
+        assert oven_topic not in self._flush(client)
+
+        # The next tick re-stamps _updated_at, so the retained state is refreshed
+        broker_sim._now_dt += timedelta(seconds=1)
+        broker_sim._publish_powder_coating_state()
+        assert oven_topic in self._flush(client)
+
+    def test_zone_states_resent_after_reconnect(self, broker_sim):
+        client = broker_sim._mqtt
+        oven_topic = f"{client.base_topic}/{broker_sim._powder_coating_line.topics['curing_state']}"
+        broker_sim._publish_powder_coating_state()
+        self._flush(client)
+
+        client._on_connect(client._client, None, {}, 0)
+        broker_sim._publish_powder_coating_state()
+
+        assert oven_topic in self._flush(client)
+
+    def test_sensors_on_disabled_sites_not_generated(self, simulator, mock_mqtt):
+        press = simulator._cells["press_brake_01"]
+        simulator._sites_enabled[press.config.area_id] = False
+        last_update = press.sensors["power_kw"]._last_update
+
+        simulator._publish_sensors()
+
+        assert any("/laser_01/" in topic for topic, _ in mock_mqtt.publishes)
+        assert not any("/press_brake_01/" in topic for topic, _ in mock_mqtt.publishes)
+        assert press.sensors["power_kw"]._last_update == last_update
 
     def test_generate_initial_jobs(self, simulator):
         simulator._generate_initial_jobs()
@@ -60,10 +148,68 @@ class TestSimulator:
 
         assert len(simulator._jobs) == initial_count + 1
 
+    def test_agv_speed_draws_are_clipped(self, simulator):
+        speeds = [simulator._next_agv_speed() for _ in range(600)]
+
+        assert all(0.5 <= speed <= 2.0 for speed in speeds)
+        assert 1.3 < sum(speeds) / len(speeds) < 1.7
+
+    def test_random_seed_repeats_draws(self, default_config, mock_mqtt):
+        first = Simulator(default_config, mqtt_client=mock_mqtt)
+        second = Simulator(default_config, mqtt_client=mock_mqtt)
+
+        assert first._rng.random() == second._rng.random()
+        assert first._random.random() == second._random.random()
+
+    def test_random_seed_repeats_jobs_and_operators(self, default_config, mock_mqtt):
+        def snapshot(sim):
+            jobs = [
+                (j.job_id, j.customer, j.routing, j.qty_target, j.priority)
+                for j in sim._jobs.values()
+            ]
+            operators = [
+                (op.operator_id, op.first_name, op.last_name, op.role, op.shift)
+                for op in sim._operator_gen.operators.values()
+            ]
+            return jobs, operators
+
+        # Different global state per run: only the configured seed may matter
+        random.seed(1)
+        first = Simulator(default_config, mqtt_client=mock_mqtt)
+        random.seed(2)
+        second = Simulator(default_config, mqtt_client=mock_mqtt)
+
+        assert snapshot(first) == snapshot(second)
+        first._generate_new_job()
+        second._generate_new_job()
+        assert snapshot(first) == snapshot(second)
+
+    def test_random_seed_does_not_reseed_global_random(self, default_config, mock_mqtt):
+        with patch.object(random, "seed") as seed:
+            Simulator(default_config, mqtt_client=mock_mqtt)
+
+        seed.assert_not_called()
+
+    def test_color_change_fires_on_scheduled_tick(self, simulator):
+        line = simulator._powder_coating_line
+        simulator._tick_count = 100
+        simulator._next_color_change_tick = 100
+
+        with patch.object(line, "change_color") as change_color:
+            simulator._update_powder_coating_line()
+
+        change_color.assert_called_once()
+        assert simulator._next_color_change_tick > 100
+
+    def test_shift_check_schedules_next_hour_boundary(self, simulator):
+        simulator._check_shift_change()
+
+        remaining = simulator._next_shift_check_mono - simulator._now_mono
+        assert 0 < remaining <= 3600
+
     def test_job_limit(self, simulator):
-        # Generate jobs up to the limit
-        for _ in range(25):
-            simulator._generate_new_job()
+        # Ask for more jobs than the limit in one call
+        simulator._generate_new_job(count=25)
 
         # Should not exceed 20
         assert len(simulator._jobs) <= 20
@@ -73,53 +219,34 @@ class TestCellState:
     """Tests for CellState."""
 
     def test_initial_state_is_idle(self):
-        from metalfab_uns_sim.config import CellConfig
-
-        cell_config = CellConfig(
-            id="test_cell",
-            name="Test Cell",
-            cell_type="laser_cutter",
-        )
-        cell = CellState(config=cell_config)
+        cell = CellState(config=_LASER_CFG)
 
-        assert cell.state == PackMLState.IDLE
+        assert cell.state is PackMLState.IDLE
 
     def test_cycle_count_starts_at_zero(self):
-        from metalfab_uns_sim.config import CellConfig
-
-        cell_config = CellConfig(
-            id="test_cell",
-            name="Test Cell",
-            cell_type="press_brake",
-        )
-        cell = CellState(config=cell_config)
+        cell = CellState(config=_PRESS_BRAKE_CFG)
 
         assert cell.cycle_count == 0
         assert cell.parts_produced == 0
         assert cell.parts_scrap == 0
 
+    def test_mark_state_change_resets_elapsed_time(self):
+        cell = CellState(config=_LASER_CFG)
+        cell.state_since_mono -= 90000  # More than a day in state
 
-class TestSimulatorStateTransitions:
-    """Tests for state machine transitions."""
+        assert cell.seconds_in_state() > 86400
 
-    @pytest.fixture
-    def config(self):
-        return Config.default()
+        cell.mark_state_change()
+        assert cell.seconds_in_state() < 1
 
-    @pytest.fixture
-    def mock_mqtt(self):
-        mqtt = MagicMock()
-        mqtt.connected = True
-        mqtt.connect.return_value = True
-        mqtt.publish.return_value = True
-        mqtt.base_topic = "umh/v1/test/site"
-        return mqtt
+    def test_seconds_in_state_uses_given_clock(self):
+        cell = CellState(config=_LASER_CFG)
 
-    @pytest.fixture
-    def simulator(self, config, mock_mqtt):
-        sim = Simulator(config, mqtt_client=mock_mqtt)
-        sim._generate_initial_jobs()
-        return sim
+        assert cell.seconds_in_state(cell.state_since_mono + 5.0) == 5.0
+
+
+class TestSimulatorStateTransitions:
+    """Tests for state machine transitions."""
 
     def test_idle_to_starting_with_job(self, simulator):
         cell = simulator._cells["laser_01"]
@@ -127,22 +254,101 @@ class TestSimulatorStateTransitions:
         cell.current_job = None
 
         # Queue a job for this cell
-        job = simulator._job_generator.generate_job()
-        job.routing = ["laser_01"]
-        job.status = JobStatus.QUEUED
-        simulator._jobs[job.job_id] = job
+        job = _make_job("J1", ["laser_01"])
+        _add_queued(simulator, job)
 
         simulator._update_machine_states()
 
         # Cell should transition to STARTING
-        assert cell.state == PackMLState.STARTING
+        assert cell.state is PackMLState.STARTING
         assert cell.current_job is not None
 
-    def test_get_sub_state_for_type(self, simulator):
-        from metalfab_uns_sim.generators import MachineSubState
+    def test_get_next_job_for_cell_uses_queue_order(self, simulator):
+        first = _make_job("J1", ["laser_01", "press_brake_01"])
+        second = _make_job("J2", ["laser_01", "press_brake_01"])
+        _add_queued(simulator, first, second)
+
+        assert simulator._get_next_job_for_cell("laser_01") is first
+        assert first.status is JobStatus.IN_PROGRESS
+        assert simulator._get_next_job_for_cell("laser_01") is second
+        assert simulator._get_next_job_for_cell("press_brake_01") is None
+
+    def test_advance_job_queues_next_cell(self, simulator):
+        job = _make_job("J1", ["laser_01", "press_brake_01"])
+        _add_queued(simulator, job)
+        simulator._get_next_job_for_cell("laser_01")
+
+        simulator._advance_job(job)
+
+        assert job.status is JobStatus.QUEUED
+        assert simulator._get_next_job_for_cell("press_brake_01") is job
+
+    def test_advance_job_records_dpp_operation_at_level_4(self, simulator):
+        simulator.level = ComplexityLevel.LEVEL_4_FULL
+        operator = next(iter(simulator._operator_gen.operators.values()))
+        simulator._cells["laser_01"].operator_id = operator.operator_id
+        job = _make_job("J1", ["laser_01", "press_brake_01"])
+        _add_queued(simulator, job)
+        simulator._get_next_job_for_cell("laser_01")
+
+        simulator._advance_job(job)
+
+        dpp = simulator._digital_passports[job.job_id]
+        assert dpp.customer == "Test"
+        [operation] = dpp.operations
+        assert operation.machine_id == "laser_01"
+        assert operation.operator_name == f"{operator.first_name} {operator.last_name}"
+        assert dpp.carbon_footprint.cutting_co2_kg == operation.co2_kg
+
+    def test_update_jobs_releases_created_jobs(self, simulator):
+        simulator._generate_initial_jobs()
+        simulator._update_jobs()
+
+        assert all(job.status is JobStatus.QUEUED for job in simulator._jobs.values())
+        assert not simulator._created_jobs
+
+    def test_update_jobs_indexes_every_registered_job(self, simulator):
+        simulator._generate_initial_jobs()
+        simulator._add_job(_make_job("J1", ["laser_01"]))
+
+        simulator._update_jobs()
+
+        queued = {job.job_id for queue in simulator._queued_by_cell.values() for job in queue}
+        assert queued == set(simulator._jobs)
+
+    def test_update_jobs_removes_expired_shipped_jobs(self, simulator):
+        job = _make_job("J1", ["laser_01"])
+        _add_queued(simulator, job)
+        simulator._get_next_job_for_cell("laser_01")
+        simulator._advance_job(job)
+        assert job.status is JobStatus.SHIPPED
+
+        simulator._update_jobs()
+        assert job.job_id in simulator._jobs
+
+        simulator._ship_gc_heap[0] = (0.0, job.job_id)
+        simulator._update_jobs()
+        assert job.job_id not in simulator._jobs
+
+    def test_estimate_operation_energy_uses_cell_power(self, simulator):
+        laser = simulator._cells["laser_01"]
 
-        assert simulator._get_sub_state_for_type("laser_cutter") == MachineSubState.CUTTING
-        assert simulator._get_sub_state_for_type("press_brake") == MachineSubState.BENDING
-        assert simulator._get_sub_state_for_type("robot_weld") == MachineSubState.WELDING
-        assert simulator._get_sub_state_for_type("paint_booth") == MachineSubState.PAINTING
-        assert simulator._get_sub_state_for_type("unknown") == MachineSubState.NONE
+        assert laser.operation_power_kw == 25.0
+        assert simulator._estimate_operation_energy(laser, 30.0) == pytest.approx(12.5)
+
+
+class TestSubStateMapping:
+    """Tests for the cell type to sub-state lookup."""
+
+    @pytest.mark.parametrize(
+        "cell_type,expected",
+        [
+            ("laser_cutter", MachineSubState.CUTTING),
+            ("press_brake", MachineSubState.BENDING),
+            ("robot_weld", MachineSubState.WELDING),
+            ("paint_booth", MachineSubState.PAINTING),
+            ("unknown", MachineSubState.NONE),
+        ],
+    )
+    def test_get_sub_state_for_type(self, shared_simulator, cell_type, expected):
+        assert shared_simulator._get_sub_state_for_type(cell_type) == expected